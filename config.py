@@ -13,4 +13,52 @@ APPIUM_SERVER_URL = "http://127.0.0.1:4723/wd/hub"
 
 # 等待超时时间设置
 IMPLICIT_WAIT_TIME = 10
-EXPLICIT_WAIT_TIME = 15
\ No newline at end of file
+EXPLICIT_WAIT_TIME = 15  # wait_for_*等显式等待的默认超时时间
+TEST_TIME_BUDGET = 300  # 单个测试的总时间预算（秒），所有等待、查找、滑动和ADB调用都从中扣除
+ADB_TIMEOUT = 30  # 单条ADB命令的超时时间
+COMMAND_TIMEOUT = 120  # driver单条HTTP命令的超时时间，与selenium的默认值一致；测试中会被缩小到剩余预算以内
+
+# 异步命令执行器配置
+ASYNC_MAX_CONCURRENCY = 8  # 同时在途的最大请求数
+HTTP_POOL_SIZE = 8  # 保持的keep-alive长连接数量
+
+# 图像模板定位配置
+ICON_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testdata", "icons")  # icon模板图片目录，放入从设备截取的PNG
+IMAGE_MATCH_THRESHOLD = 0.85  # 归一化互相关的最低匹配得分
+IMAGE_MATCH_SCALES = (0.9, 1.0, 1.1)  # 模板的缩放比例，适配不同分辨率的设备；每多一个比例匹配耗时约增加三分之一
+IMAGE_LOCATE_TIME_BUDGET = 1.0  # 一帧中定位一组icon（含截图解码）的耗时上限（秒）
+IMAGE_PYRAMID_LEVELS = 2  # 粗匹配最多使用的金字塔层数
+IMAGE_COARSE_MIN_SIZE = 16  # 粗匹配模板的最小边长（像素），较小的模板自动减少金字塔层数，避免细线条在缩小后被抹平
+IMAGE_COARSE_CANDIDATES = 12  # 每个缩放比例下进入精匹配的候选位置数（按每个要返回的区域计）
+IMAGE_COARSE_SCORE_RANGE = 0.25  # 粗匹配得分与该比例最高分相差不超过此值的位置才进入精匹配
+
+# 界面跳转图配置
+SCREEN_GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testdata", "screen_graph.json")  # 跳转图保存路径
+# 界面名称到标志元素定位器(by, value)的映射，爬取时出现该元素的界面会被标注为该名称，如{"course_list": ("id", "cn.jiazhengye.panda_home:id/rv_course")}
+SCREEN_MARKERS = {}
+# 爬取时不允许点击的元素定位器(by, value)，by为id、accessibility id、class name或text（文字包含value即排除）；
+# 爬虫使用真实账号登录，误点退出登录会使之后记录的跳转全部来自未登录界面，误点删除、支付会改动账号数据
+CRAWL_EXCLUDED = [
+    ("text", "退出"),
+    ("text", "注销"),
+    ("text", "删除"),
+    ("text", "支付"),
+    ("text", "付款"),
+    ("text", "购买"),
+]
+
+# 本地缓存目录，保存测试结果缓存等运行时数据
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".uiauto_cache")
+RESULT_CACHE_PATH = os.path.join(CACHE_DIR, "results.json")  # 测试结果缓存
+
+# 步骤级检查点配置
+STEP_RETRY_BUDGET = 3  # 单个测试内允许的步骤重试总次数
+FLAKE_STATS_PATH = os.path.join(CACHE_DIR, "flake_stats.json")  # 步骤不稳定统计
+QUARANTINE_MIN_RUNS = 10  # 步骤至少执行这么多次后才参与隔离判断
+QUARANTINE_FLAKE_RATE = 0.3  # 重试后才成功或最终失败的比例达到该值时隔离步骤
+
+# 测试发现与启动性能配置
+TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests")  # 测试模块目录
+DISCOVERY_CACHE_PATH = os.path.join(CACHE_DIR, "discovery.json")  # 测试发现结果缓存
+IMPORT_TIME_BUDGET = 0.5  # 导入全部页面对象和测试模块的耗时上限（秒），留有余量，避免在较慢的CI机器上误报
+LIST_TIME_BUDGET = 1.0  # main.py --list的耗时上限（秒，不含解释器启动），留有余量
@@ -0,0 +1,31 @@
+from appium import webdriver
+from appium.options.android import UiAutomator2Options
+from config import DEVICE_NAME, APP_PACKAGE, APP_ACTIVITY, APPIUM_SERVER_URL, IMPLICIT_WAIT_TIME, SCREEN_MARKERS
+from config import CRAWL_EXCLUDED
+from page_objects.base_page import BasePage
+from page_objects.login import LoginPage
+from page_objects.start import StartPage
+from utils.nav_graph import AppCrawler, ScreenGraph
+
+# 遍历应用界面，构建并保存跳转图，供BasePage.navigate_to使用
+# 界面可以通过名称（首页为home，其余来自SCREEN_MARKERS）、Activity名称或指纹引用
+# 符合CRAWL_EXCLUDED的元素（退出登录、删除、支付等）不会被点击
+if __name__ == "__main__":
+    options = UiAutomator2Options()
+    options.platform_name = "Android"
+    options.device_name = DEVICE_NAME
+    options.app_package = APP_PACKAGE
+    options.app_activity = APP_ACTIVITY
+
+    driver = webdriver.Remote(APPIUM_SERVER_URL, options=options)
+    driver.implicitly_wait(IMPLICIT_WAIT_TIME)
+    try:
+        StartPage(driver).start()
+        LoginPage(driver).login()
+
+        page = BasePage(driver)
+        graph = ScreenGraph()
+        graph.label(page.current_screen(), "home")
+        AppCrawler(page, graph, markers=SCREEN_MARKERS, excluded=CRAWL_EXCLUDED).crawl()
+    finally:
+        driver.quit()
@@ -1,10 +1,23 @@
+import argparse
 import unittest
-from tests.test_icon_click import TestIconClick
-from tests.test_check_courselist import TestHomepageSlideClick
+from utils.discovery import discover_tests, select_tests
 
 if __name__ == "__main__":
-    suite = unittest.TestSuite()
-    suite.addTest(unittest.makeSuite(TestIconClick))
-    suite.addTest(unittest.makeSuite(TestHomepageSlideClick))
-    runner = unittest.TextTestRunner()
-    runner.run(suite)
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--list", action="store_true", help="只列出选中的测试，不执行")
+    parser.add_argument("-k", dest="patterns", action="append", help="按名称筛选测试，可重复指定")
+    parser.add_argument("--shard", help="只执行其中一个分片，格式为序号/总数，如2/4")
+    parser.add_argument("--force", action="store_true", help="忽略结果缓存，强制执行全部测试")
+    args = parser.parse_args()
+
+    # 测试发现只解析源码，筛选和分片完成后才导入选中的测试模块
+    test_ids = select_tests(discover_tests(), patterns=args.patterns, shard=args.shard)
+    if args.list:
+        for test_id in test_ids:
+            print(test_id)
+    else:
+        from utils.result_cache import CachedTestRunner
+
+        suite = unittest.defaultTestLoader.loadTestsFromNames(test_ids)
+        runner = CachedTestRunner(force=args.force)
+        runner.run(suite)
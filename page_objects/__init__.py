@@ -0,0 +1,19 @@
+import importlib
+
+# 页面对象按需导入：访问page_objects.HomePage时才加载对应模块
+_LAZY_ATTRIBUTES = {
+    "BasePage": "page_objects.base_page",
+    "HomePage": "page_objects.home_page",
+    "LoginPage": "page_objects.login",
+    "StartPage": "page_objects.start",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
@@ -1,9 +1,22 @@
-from appium.webdriver.common.mobileby import MobileBy
-from appium.webdriver.common.touch_action import TouchAction
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from utils.lazy import lazy_import
+from utils.dependencies import dependency_recorder
+from utils.checkpoint import checkpoint_step
+from utils.deadline import (DeadlineExceeded, current_deadline, fit_timeout, raise_if_expired, set_command_timeout,
+                            within_deadline)
+from utils.async_executor import get_executor
+from utils.nav_graph import ScreenGraph, screen_fingerprint
+from config import IMAGE_MATCH_THRESHOLD, IMPLICIT_WAIT_TIME, EXPLICIT_WAIT_TIME, ADB_TIMEOUT, COMMAND_TIMEOUT
+import asyncio
+import contextlib
 import os
 import subprocess
+import time
+
+# appium和selenium在第一次使用时才导入，列出、筛选测试时不会加载
+MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
+TouchAction = lazy_import("appium.webdriver.common.touch_action", "TouchAction")
+WebDriverWait = lazy_import("selenium.webdriver.support.ui", "WebDriverWait")
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
 
 
 class BasePage:
@@ -16,6 +29,60 @@ class BasePage:
         """
         self.driver = driver
 
+    @property
+    def async_executor(self):
+        """
+        异步命令执行器，同一个driver上的所有页面对象共用一个执行器和连接池。
+        """
+        return get_executor(self.driver)
+
+    def _fit_command_timeout(self, step, timeout=None):
+        """
+        从测试的剩余时间预算中申请超时时间，同时把driver单条命令的HTTP超时缩小到剩余预算以内。
+
+        返回:
+        float: 实际可用的超时时间；没有设置预算时原样返回timeout
+        """
+        remaining = fit_timeout(step)
+        if remaining is None:
+            return timeout
+        set_command_timeout(self.driver, min(COMMAND_TIMEOUT, remaining))
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _fit_implicit_wait(self, step):
+        """
+        从测试的剩余时间预算中申请查找元素的时间，剩余预算不足隐式等待时长时缩短隐式等待。
+        """
+        timeout = self._fit_command_timeout(step, IMPLICIT_WAIT_TIME)
+        if timeout < IMPLICIT_WAIT_TIME:
+            self.driver.implicitly_wait(timeout)
+
+    @contextlib.contextmanager
+    def _explicit_wait(self, step, timeout=None):
+        """
+        创建显式等待，等待期间关闭隐式等待。
+
+        否则WebDriverWait每次轮询中的查找都会按隐式等待时长阻塞，总等待时间可能远超timeout和剩余预算。
+        等待结束后恢复隐式等待，不超过剩余预算。等待因预算用尽而超时时抛出DeadlineExceeded。
+        """
+        timeout = self._fit_command_timeout(step, timeout or EXPLICIT_WAIT_TIME)
+        self.driver.implicitly_wait(0)
+        try:
+            yield WebDriverWait(self.driver, timeout)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            # 等待时长被缩小到剩余预算，超时说明预算已经用尽
+            raise_if_expired(e)
+            raise
+        finally:
+            deadline = current_deadline()
+            implicit_wait = IMPLICIT_WAIT_TIME
+            if deadline is not None:
+                implicit_wait = max(0, min(IMPLICIT_WAIT_TIME, deadline.remaining()))
+            self.driver.implicitly_wait(implicit_wait)
+
+    @within_deadline
     def find_element(self, by, value):
         """
         在当前驱动实例中查找单个元素。
@@ -24,8 +91,11 @@ class BasePage:
         :param value: 与定位方式对应的值。
         :return: 返回找到的元素对象。
         """
+        dependency_recorder.record(self, by, value)
+        self._fit_implicit_wait(f"find_element({by}={value})")
         return self.driver.find_element(by, value)
 
+    @within_deadline
     def find_elements(self, by, value):
         """
         在当前驱动对象中通过指定的查找方式和值来定位一组元素。
@@ -37,8 +107,12 @@ class BasePage:
         返回:
         - 一组元素对象，如果找不到元素，则返回空列表。
         """
+        dependency_recorder.record(self, by, value)
+        self._fit_implicit_wait(f"find_elements({by}={value})")
         return self.driver.find_elements(by, value)
 
+    @checkpoint_step
+    @within_deadline
     def click_element(self, by, value):
         """
         点击页面上的一个元素。
@@ -58,6 +132,8 @@ class BasePage:
         # 对找到的元素执行点击操作
         element.click()
 
+    @checkpoint_step
+    @within_deadline
     def input_text(self, by, value, text):
         """
         向指定的页面元素输入文本。
@@ -78,6 +154,7 @@ class BasePage:
         # 向找到的元素输入指定的文本
         element.send_keys(text)
 
+    @within_deadline
     def get_element_text(self, by, value):
         """
         根据指定的查找方式和值获取页面元素的文本。
@@ -97,6 +174,59 @@ class BasePage:
         # 返回元素的文本内容
         return element.text
 
+    async def find_elements_async(self, by, value):
+        """
+        find_elements的异步版本，通过异步命令执行器查找一组元素。
+
+        参数:
+        - by: 定位元素的方式，例如通过ID、类名、XPath等。
+        - value: 基于所选定位方式的值。
+
+        返回:
+        - 一组元素对象，如果找不到元素，则返回空列表。
+        """
+        dependency_recorder.record(self, by, value)
+        return await self.async_executor.find_elements(by, value)
+
+    async def get_elements_text_async(self, by, value):
+        """
+        get_element_text的异步批量版本：查找所有匹配的元素，并发读取它们的文本。
+
+        返回:
+        list: 各元素的文本内容，顺序与元素在页面上的顺序一致。
+        """
+        elements = await self.find_elements_async(by, value)
+        return await self.async_executor.get_texts(elements)
+
+    async def get_elements_attribute_async(self, by, value, name):
+        """
+        查找所有匹配的元素，并发读取它们的指定属性。
+
+        参数:
+        - by: 定位元素的方式。
+        - value: 定位值。
+        - name: 属性名称，如content-desc、resource-id、bounds等。
+
+        返回:
+        list: 各元素的属性值，顺序与元素在页面上的顺序一致。
+        """
+        elements = await self.find_elements_async(by, value)
+        return await self.async_executor.get_attributes(elements, name)
+
+    def get_elements_text(self, by, value):
+        """
+        在同步代码中并发读取所有匹配元素的文本。
+        """
+        return asyncio.run(self.get_elements_text_async(by, value))
+
+    def get_elements_attribute(self, by, value, name):
+        """
+        在同步代码中并发读取所有匹配元素的指定属性。
+        """
+        return asyncio.run(self.get_elements_attribute_async(by, value, name))
+
+    @checkpoint_step
+    @within_deadline
     def clear_element_text(self, by, value):
         """
         清空指定元素的文本内容。
@@ -116,7 +246,7 @@ class BasePage:
         # 清空找到的元素的文本内容
         element.clear()
 
-    def wait_for_element_to_be_clickable(self, by, value, timeout=10):
+    def wait_for_element_to_be_clickable(self, by, value, timeout=None):
         """
         等待元素可被点击
 
@@ -126,7 +256,7 @@ class BasePage:
         参数:
         by (str): 定位元素的方法，如XPath、ID等
         value (str): 元素的值，与定位方法对应
-        timeout (int): 最长等待时间，默认为10秒
+        timeout (int): 最长等待时间，默认为配置中的EXPLICIT_WAIT_TIME，不会超过测试剩余的时间预算
 
         返回:
         WebElement: 可点击的网页元素
@@ -134,16 +264,19 @@ class BasePage:
         抛出:
         Exception: 如果元素定位失败或超时，抛出异常
         """
+        dependency_recorder.record(self, by, value)
         try:
-            # 初始化WebDriverWait对象，设置最大等待时间为timeout秒
-            wait = WebDriverWait(self.driver, timeout)
-            # 使用until方法等待元素可点击，并返回该元素
-            return wait.until(EC.element_to_be_clickable((by, value)))
+            # 初始化显式等待，最大等待时间为timeout秒
+            with self._explicit_wait(f"wait_for_element_to_be_clickable({by}={value})", timeout) as wait:
+                # 使用until方法等待元素可点击，并返回该元素
+                return wait.until(EC.element_to_be_clickable((by, value)))
+        except DeadlineExceeded:
+            raise
         except:
             # 如果发生异常，抛出元素定位失败的异常
             raise Exception('元素定位失败')
 
-    def wait_for_element_to_be_visible(self, by, value, timeout=10):
+    def wait_for_element_to_be_visible(self, by, value, timeout=None):
         """
         等待页面上的元素可见。
 
@@ -152,16 +285,19 @@ class BasePage:
         参数:
         - by: 用于定位元素的方法，例如XPath、CSS选择器等。
         - value: 元素定位方法的具体值。
-        - timeout: 超时时间（秒），在此时间内如果元素未变为可见，则抛出异常。默认为10秒。
+        - timeout: 超时时间（秒），在此时间内如果元素未变为可见，则抛出异常。默认为配置中的EXPLICIT_WAIT_TIME，不会超过测试剩余的时间预算。
 
         返回值:
         - 返回找到的元素对象。
         """
-        # 创建WebDriverWait实例，使用driver和指定的超时时间。
-        wait = WebDriverWait(self.driver, timeout)
-        # 使用until方法等待条件满足，即元素可见。
-        return wait.until(EC.visibility_of_element_located((by, value)))
+        dependency_recorder.record(self, by, value)
+        # 创建显式等待，使用指定的超时时间。
+        with self._explicit_wait(f"wait_for_element_to_be_visible({by}={value})", timeout) as wait:
+            # 使用until方法等待条件满足，即元素可见。
+            return wait.until(EC.visibility_of_element_located((by, value)))
 
+    @checkpoint_step
+    @within_deadline
     def swipe_up(self, duration=1000):
         """
         在屏幕上执行上滑操作。
@@ -172,6 +308,7 @@ class BasePage:
         参数:
         duration (int): 上滑操作持续的时间，以毫秒为单位。默认值为1000毫秒（1秒）。
         """
+        self._fit_command_timeout("swipe_up")
         # 获取当前屏幕的大小
         screen_size = self.driver.get_window_size()
 
@@ -186,6 +323,8 @@ class BasePage:
         # 调用webdriver的swipe方法执行上滑操作
         self.driver.swipe(start_x, start_y, end_x, end_y, duration)
 
+    @checkpoint_step
+    @within_deadline
     def swipe_down(self, duration=1000):
         """
         在屏幕上演示向下滑动的操作。
@@ -200,6 +339,7 @@ class BasePage:
         返回值:
         此函数没有返回值。
         """
+        self._fit_command_timeout("swipe_down")
         # 获取当前窗口的大小
         screen_size = self.driver.get_window_size()
 
@@ -212,12 +352,15 @@ class BasePage:
         # 执行滑动操作
         self.driver.swipe(start_x, start_y, end_x, end_y, duration)
 
+    @checkpoint_step
+    @within_deadline
     def swipe_left(self, duration=1000):
         """
         在屏幕上执行向左滑动的操作。
 
         :param duration: 滑动操作持续的时间，以毫秒为单位，默认为1000毫秒（1秒）。
         """
+        self._fit_command_timeout("swipe_left")
         # 获取当前屏幕的尺寸信息
         screen_size = self.driver.get_window_size()
 
@@ -230,12 +373,15 @@ class BasePage:
         # 执行从右向左的滑动操作
         self.driver.swipe(start_x, start_y, end_x, end_y, duration)
 
+    @checkpoint_step
+    @within_deadline
     def swipe_right(self, duration=1000):
         """
         在屏幕上执行向右滑动的操作。
 
         :param duration: 滑动操作持续的时间，以毫秒为单位，默认为1000毫秒（1秒）。
         """
+        self._fit_command_timeout("swipe_right")
         # 获取当前屏幕的尺寸信息
         screen_size = self.driver.get_window_size()
 
@@ -251,6 +397,8 @@ class BasePage:
         # 执行从左到右的滑动操作，duration参数定义了滑动的持续时间
         self.driver.swipe(start_x, start_y, end_x, end_y, duration)
 
+    @checkpoint_step
+    @within_deadline
     def long_press_element(self, element):
         """
         执行长按元素的操作。
@@ -263,11 +411,14 @@ class BasePage:
         返回值:
         无
         """
+        self._fit_command_timeout("long_press_element")
         # 初始化TouchAction对象，传入driver作为参数
         actions = TouchAction(self.driver)
         # 对指定的element执行长按操作，并触发（perform）
         actions.long_press(element).perform()
 
+    @checkpoint_step
+    @within_deadline
     def zoom_in(self):
         """
         使用双指缩放手势来放大屏幕。
@@ -276,6 +427,7 @@ class BasePage:
         然后定义两个手指的起始和结束位置。两个手指从屏幕的对角线方向向中心移动，
         以实现缩放效果。
         """
+        self._fit_command_timeout("zoom_in")
         # 获取当前窗口的尺寸
         screen_size = self.driver.get_window_size()
 
@@ -309,31 +461,105 @@ class BasePage:
 
     # 根据指定的查找方式和值，向下滑动直到找到元素
     # 此函数用于在移动应用自动化测试中，处理需要通过滑动来查找元素的场景
+    # 每次查找和滑动都从测试的时间预算中扣除，预算用尽时抛出DeadlineExceeded
     def swipe_down_until_element_found(self, by, value):
-        # 进入一个无限循环，直到找到元素或发生异常
+        # 循环直到找到元素或时间预算用尽
         while True:
             try:
                 # 尝试根据提供的查找方式和值找到元素
                 element = self.find_element(by, value)
                 # 如果元素成功找到，返回该元素，结束循环
                 return element
+            except DeadlineExceeded:
+                # 时间预算用尽，不再继续滑动
+                raise
             except:
                 # 如果在当前屏幕未找到元素，则执行向下滑动操作，以显示更多内容
                 self.swipe_down()
 
+    @checkpoint_step
+    @within_deadline
     def go_back(self):
         """
         使driver返回到前一个页面。
         """
+        self._fit_command_timeout("go_back")
         self.driver.back()
 
+    @within_deadline
+    def current_screen(self):
+        """
+        获取当前界面的指纹，用于在跳转图中识别界面。
+
+        返回:
+        str: 当前界面的层级结构指纹
+        """
+        self._fit_command_timeout("current_screen")
+        return screen_fingerprint(self.driver.page_source)
+
+    def perform_action(self, action):
+        """
+        执行跳转图中记录的一个操作。
+
+        参数:
+        action (dict): 操作描述，type为click（带by和value）、swipe（带direction）或back。
+
+        返回:
+        float: 操作耗时（秒），作为跳转图中边的代价
+        """
+        started = time.monotonic()
+        if action["type"] == "click":
+            self.click_element(action["by"], action["value"])
+        elif action["type"] == "swipe":
+            getattr(self, f"swipe_{action['direction']}")()
+        elif action["type"] == "back":
+            self.go_back()
+        else:
+            raise ValueError(f"未知的操作类型: {action['type']}")
+        return time.monotonic() - started
+
+    def navigate_to(self, screen, graph=None, max_replans=3):
+        """
+        沿跳转图中代价最小的路径从当前界面导航到目标界面，无需重启应用。
+
+        每执行一步都会核对到达的界面，与预期不符时从实际所在界面重新规划路径。
+
+        参数:
+        screen (str): 目标界面的名称、Activity名称或指纹。
+        graph (ScreenGraph): 使用的跳转图，默认加载配置中SCREEN_GRAPH_PATH保存的图。
+        max_replans (int): 最多重新规划的次数。
+
+        抛出:
+        Exception: 如果目标界面不可达或重新规划次数用尽
+        """
+        if graph is None:
+            graph = ScreenGraph()
+        dependency_recorder.record_file(graph.path)
+        targets = graph.resolve(screen)
+        current = self.current_screen()
+        for _ in range(max_replans + 1):
+            path = graph.shortest_path(current, screen)
+            if path is None:
+                raise Exception(f'无法导航到界面{screen}：跳转图中没有从{current}出发的路径')
+            for edge in path:
+                self.perform_action(edge["action"])
+                current = self.current_screen()
+                if current != edge["to"]:
+                    break
+            if current in targets:
+                return
+        raise Exception(f'无法导航到界面{screen}：重新规划{max_replans}次后仍未到达')
+
     #验证元素是否存在
-    def assert_element_exists(self, by, value, timeout=10):
+    def assert_element_exists(self, by, value, timeout=None):
+        dependency_recorder.record(self, by, value)
         try:
-            # 使用WebDriverWait等待元素出现，超时时间为timeout秒
-            wait = WebDriverWait(self.driver, timeout)
-            # 返回等待结果，如果在指定时间内找到元素，则返回该元素
-            return wait.until(EC.presence_of_element_located((by, value)))
+            # 使用显式等待等待元素出现，超时时间为timeout秒
+            with self._explicit_wait(f"assert_element_exists({by}={value})", timeout) as wait:
+                # 返回等待结果，如果在指定时间内找到元素，则返回该元素
+                return wait.until(EC.presence_of_element_located((by, value)))
+        except DeadlineExceeded:
+            raise
         except:
             # 如果元素未找到，捕获异常并抛出断言错误，提示元素不存在
             raise AssertionError("元素不存在")
@@ -358,6 +584,7 @@ class BasePage:
         if actual_text != expected_text:
             raise AssertionError(f"元素文本与预期不符，实际为{actual_text}，预期为{expected_text}")
 
+    @within_deadline
     def take_screenshot(self, screenshot_dir, screenshot_name):
         """
         截取屏幕并保存截图。
@@ -379,9 +606,70 @@ class BasePage:
         # 组合截图的完整路径
         screenshot_path = os.path.join(screenshot_dir, screenshot_name)
 
+        self._fit_command_timeout("take_screenshot")
         # 使用webdriver的截图功能，将当前屏幕内容保存为图片文件
         self.driver.get_screenshot_as_file(screenshot_path)
 
+    @within_deadline
+    def find_by_images(self, template_paths, threshold=None, max_matches=1):
+        """
+        通过图片模板定位没有稳定id的元素（如icon）。
+
+        只截一次屏，在同一帧上对所有模板做多尺度匹配，返回的区域已换算为可直接点击的屏幕坐标。
+        numpy和Pillow只在调用时才导入。
+
+        参数:
+        template_paths (list): 模板图片路径列表。
+        threshold (float): 最低匹配得分，默认使用配置中的IMAGE_MATCH_THRESHOLD。
+        max_matches (int): 每个模板最多返回的区域数量。
+
+        返回:
+        dict: 模板路径到匹配区域列表的映射，区域按得分从高到低排列，未匹配到的模板对应空列表。
+        """
+        from utils import image_locator
+
+        for path in template_paths:
+            dependency_recorder.record(self, "image", path)
+            dependency_recorder.record_file(path)
+        self._fit_command_timeout("find_by_images")
+        screen = image_locator.to_gray(self.driver.get_screenshot_as_png())
+        if threshold is None:
+            threshold = IMAGE_MATCH_THRESHOLD
+        results = image_locator.locate(screen, template_paths, threshold=threshold, max_matches=max_matches)
+
+        # 截图为物理像素，点击坐标以窗口尺寸为准，二者不一致时按比例换算
+        ratio = self.driver.get_window_size()['width'] / screen.shape[1]
+        if ratio != 1:
+            results = {
+                path: [image_locator.Match(int(m.x * ratio), int(m.y * ratio), int(m.width * ratio),
+                                           int(m.height * ratio), m.score) for m in matches]
+                for path, matches in results.items()
+            }
+        return results
+
+    def find_by_image(self, template_path, threshold=None):
+        """
+        通过单个图片模板定位元素。
+
+        返回:
+        Match: 得分最高的匹配区域。
+
+        抛出:
+        Exception: 如果截图中没有匹配的区域
+        """
+        matches = self.find_by_images([template_path], threshold=threshold)[template_path]
+        if not matches:
+            raise Exception(f'图片元素定位失败: {template_path}')
+        return matches[0]
+
+    @checkpoint_step
+    @within_deadline
+    def click_image(self, template_path, threshold=None):
+        """
+        点击与图片模板匹配的区域中心。
+        """
+        self.driver.tap([self.find_by_image(template_path, threshold=threshold).center])
+
     def accept_alert(self):
         """
         接受并处理警告对话框。
@@ -464,6 +752,7 @@ class BasePage:
         # 返回获取到的网络状态信息
         return network_status
 
+    @within_deadline
     def check_app_permission(self, permission):
         """
         检查应用程序是否被授予了指定的权限。
@@ -483,11 +772,13 @@ class BasePage:
         command = f"adb shell pm check-permission -u 0 {permission} {app_package}"
 
         # 执行ADB命令并获取输出结果，使用strip()移除可能的换行符或空白字符。
-        result = subprocess.check_output(command, shell=True).decode("utf-8").strip()
+        timeout = fit_timeout(command, ADB_TIMEOUT)
+        result = subprocess.check_output(command, shell=True, timeout=timeout).decode("utf-8").strip()
 
         # 检查输出结果中是否包含"granted"，以判断权限是否被授予。
         return "granted" in result
 
+    @within_deadline
     def grant_app_permission(self, permission):
         """
         为当前应用授予指定权限。
@@ -508,18 +799,22 @@ class BasePage:
         command = f"adb shell pm grant {app_package} {permission}"
 
         # 执行ADB命令，为应用授予指定的权限
-        subprocess.call(command, shell=True)
+        timeout = fit_timeout(command, ADB_TIMEOUT)
+        subprocess.call(command, shell=True, timeout=timeout)
 
     #撤销权限
+    @within_deadline
     def revoke_app_permission(self, permission):
         # 获取当前应用的包名
         app_package = self.driver.current_package
         # 构建撤销权限的adb命令
         command = f"adb shell pm revoke {app_package} {permission}"
         # 执行adb命令撤销权限
-        subprocess.call(command, shell=True)
+        timeout = fit_timeout(command, ADB_TIMEOUT)
+        subprocess.call(command, shell=True, timeout=timeout)
 
 
+    @within_deadline
     def clear_app_cache(self):
         """
         清除当前应用的缓存数据。
@@ -535,8 +830,10 @@ class BasePage:
         command = f"adb shell pm clear {app_package}"
 
         # 执行清除缓存的命令
-        subprocess.call(command, shell=True)
+        timeout = fit_timeout(command, ADB_TIMEOUT)
+        subprocess.call(command, shell=True, timeout=timeout)
 
+    @within_deadline
     def get_app_storage_path(self):
         """
         获取当前应用的存储路径。
@@ -554,7 +851,8 @@ class BasePage:
         command = f"adb shell pm path {app_package}"
 
         # 执行ADB命令并解析输出
-        result = subprocess.check_output(command, shell=True).decode("utf-8").strip()
+        timeout = fit_timeout(command, ADB_TIMEOUT)
+        result = subprocess.check_output(command, shell=True, timeout=timeout).decode("utf-8").strip()
 
         # 返回应用的存储路径
         return result
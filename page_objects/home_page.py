@@ -1,20 +1,58 @@
 from page_objects.base_page import BasePage
-from appium.webdriver.common.mobileby import MobileBy
+from utils.lazy import lazy_import
+from config import ICON_TEMPLATE_DIR
+from utils.checkpoint import checkpoint_step
+from utils.deadline import within_deadline
+from utils.dependencies import dependency_recorder
+import os
+
+MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
+
+
+# icon的类名占位符，替换为实际的icon类名；icon没有稳定的id或类名时，把图片模板放入ICON_TEMPLATE_DIR即可改用图片定位
+ICON_CLASS_NAME = "icon_class_name"
 
 
 class HomePage(BasePage):
     def __init__(self, driver):
         super().__init__(driver)
 
-    #找到所有icon
+    #icon图片模板路径列表，没有模板时为空
+    def get_icon_templates(self):
+        # 增删模板会改变定位方式，模板目录也是测试结果的依赖
+        dependency_recorder.record_file(ICON_TEMPLATE_DIR)
+        if not os.path.isdir(ICON_TEMPLATE_DIR):
+            return []
+        return sorted(
+            os.path.join(ICON_TEMPLATE_DIR, name) for name in os.listdir(ICON_TEMPLATE_DIR) if name.endswith(".png")
+        )
+
+    #找到所有icon：有图片模板时在一帧截图中定位，返回按从上到下、从左到右排列的匹配区域；否则按类名查找元素
     def get_all_icons(self):
-        return self.find_elements(MobileBy.CLASS_NAME, "icon_class_name")  # 替换为实际的icon类名
+        template_paths = self.get_icon_templates()
+        if template_paths:
+            regions = [match for matches in self.find_by_images(template_paths).values() for match in matches]
+            return sorted(regions, key=lambda match: (match.y, match.x))
+        return self.find_elements(MobileBy.CLASS_NAME, ICON_CLASS_NAME)
+
+    #并发读取所有icon的描述
+    def get_all_icon_descriptions(self):
+        return self.get_elements_attribute(MobileBy.CLASS_NAME, ICON_CLASS_NAME, "content-desc")
+
+    #通过图片模板一次定位所有icon，返回模板路径到匹配区域的映射
+    def get_all_icon_regions(self):
+        return self.find_by_images(self.get_icon_templates())
 
     #点击所有icon
+    @checkpoint_step
+    @within_deadline
     def click_icon(self, icon_index):
         icons = self.get_all_icons()
-        if icon_index < len(icons):
-            icons[icon_index].click()
-        else:
+        if icon_index >= len(icons):
             raise IndexError("无效的icon索引")
-
+        icon = icons[icon_index]
+        # 图片定位得到的是屏幕区域（Match为namedtuple），点击其中心；按类名找到的是元素，直接点击
+        if isinstance(icon, tuple):
+            self.driver.tap([icon.center])
+        else:
+            icon.click()
@@ -1,5 +1,7 @@
 from page_objects.base_page import BasePage
-from appium.webdriver.common.mobileby import MobileBy
+from utils.lazy import lazy_import
+
+MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
 
 #登录
 class LoginPage(BasePage):
@@ -0,0 +1,17 @@
+import importlib
+
+# 测试类按需导入：访问tests.TestIconClick时才加载对应的测试模块
+_LAZY_ATTRIBUTES = {
+    "TestIconClick": "tests.test_icon_click",
+    "TestHomepageSlideClick": "tests.test_check_courselist",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
@@ -1,15 +1,27 @@
 import unittest
-from appium import webdriver
+from utils.lazy import lazy_import
 from config import DEVICE_NAME, PLATFORM_VERSION, APP_PACKAGE, APP_ACTIVITY, APPIUM_SERVER_URL, IMPLICIT_WAIT_TIME
 from page_objects.home_page import HomePage
-from utils.logger import setup_logger
-from appium.webdriver.common.mobileby import MobileBy
+from utils.logger import get_logger, setup_logger
+from utils.async_executor import close_executor
+from utils.deadline import start_deadline, end_deadline, set_command_timeout
 
-logger = setup_logger()
+# appium在setUp创建驱动时才导入
+webdriver = lazy_import("appium.webdriver")
+MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
+
+logger = get_logger()
 
 
 class TestHomepageSlideClick(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_logger()
+
     def setUp(self):
+        # 设置本测试的总时间预算，之后的所有等待、查找和滑动都从中扣除
+        start_deadline()
+
         # 设置Appium驱动的配置参数
         desired_caps = {
             "platformName": "Android",
@@ -41,5 +53,9 @@ class TestHomepageSlideClick(unittest.TestCase):
 
     def tearDown(self):
         logger.info("关闭Appium驱动")
+        close_executor(self.driver)
+        # 测试中命令超时被缩小到剩余预算以内，退出会话前恢复默认值
+        set_command_timeout(self.driver)
         self.driver.quit()
+        end_deadline()
 
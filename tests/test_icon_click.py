@@ -1,15 +1,28 @@
 import unittest
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
-from utils.logger import setup_logger
+from utils.lazy import lazy_import
+from utils.logger import get_logger, setup_logger
+from utils.async_executor import close_executor
+from utils.deadline import DeadlineExceeded, start_deadline, end_deadline, set_command_timeout, raise_if_expired
 from config import DEVICE_NAME, PLATFORM_VERSION, APP_PACKAGE, APP_ACTIVITY, APPIUM_SERVER_URL, IMPLICIT_WAIT_TIME
 from page_objects.login import LoginPage
 from page_objects.start import StartPage
 from page_objects.home_page import HomePage
+from utils.checkpoint import start_session, end_session
 
-logger = setup_logger()
+# appium在setUp创建驱动时才导入
+webdriver = lazy_import("appium.webdriver")
+UiAutomator2Options = lazy_import("appium.options.android", "UiAutomator2Options")
+
+logger = get_logger()
 class TestIconClick(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_logger()
+
     def setUp(self):
+        # 设置本测试的总时间预算，之后的所有等待、查找和滑动都从中扣除
+        start_deadline()
+
         # 设置Appium驱动的配置参数
         options = UiAutomator2Options()
         options.platform_name = "Android"
@@ -23,6 +36,9 @@ class TestIconClick(unittest.TestCase):
         # 隐式等待设置
         self.driver.implicitly_wait(IMPLICIT_WAIT_TIME)
 
+        # 开启步骤级检查点，失败的步骤只从上一个检查点重试
+        start_session(self.driver)
+
     def main_flow(self):
         StartPage(self.driver).start()
         LoginPage(self.driver).login()
@@ -37,11 +53,21 @@ class TestIconClick(unittest.TestCase):
             try:
                 home_page.click_icon(i)
                 logger.info(f"成功点击第 {i + 1} 个icon")
+            except (unittest.SkipTest, DeadlineExceeded):
+                # 步骤已被隔离或时间预算用尽，直接上报
+                raise
             except Exception as e:
+                # 预算用尽导致的超时同样上报耗时报告，而不是当作icon不可点击
+                raise_if_expired(e)
                 logger.error(f"点击第 {i + 1} 个icon时出错: {e}")
                 self.fail(f"点击第 {i + 1} 个icon时出错: {e}")
 
         logger.info("首页所有icon可点击测试完成")
     def tearDown(self):
+        end_session(self.driver)
+        end_deadline()
+        close_executor(self.driver)
+        # 测试中命令超时被缩小到剩余预算以内，退出会话前恢复默认值
+        set_command_timeout(self.driver)
         # 关闭应用
         self.driver.quit()
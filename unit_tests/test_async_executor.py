@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from utils.deadline import DeadlineExceeded, end_deadline, start_deadline
+
+try:
+    import urllib3
+    from utils.async_executor import ELEMENT_KEY, AsyncCommandExecutor, close_executor, get_executor
+except ImportError:  # urllib3随selenium安装，未安装时跳过
+    AsyncCommandExecutor = None
+
+ELEMENT_COUNT = 12
+
+
+class StubWebDriverHandler(BaseHTTPRequestHandler):
+    """
+    只实现查找元素和读取文本的WebDriver桩服务，记录同时在途的请求数。
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, value):
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply([{ELEMENT_KEY: str(i)} for i in range(ELEMENT_COUNT)])
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        element_id = int(self.path.split("/")[4])
+        # 靠前的元素响应更慢，检验结果顺序不依赖完成顺序
+        time.sleep(0.01 * (ELEMENT_COUNT - element_id))
+        with server.lock:
+            server.in_flight -= 1
+        self._reply(f"text-{element_id}")
+
+
+class StubDriver:
+    def __init__(self, url):
+        self.session_id = "s1"
+        self.command_executor = SimpleNamespace(_url=url)
+
+    def create_web_element(self, element_id):
+        return SimpleNamespace(id=element_id)
+
+
+@unittest.skipIf(AsyncCommandExecutor is None, "未安装urllib3")
+class TestAsyncCommandExecutor(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubWebDriverHandler)
+        self.server.lock = threading.Lock()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.driver = StubDriver(f"http://127.0.0.1:{self.server.server_address[1]}")
+
+    def tearDown(self):
+        end_deadline()
+        close_executor(self.driver)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def read_all_texts(self, executor):
+        async def run():
+            elements = await executor.find_elements("id", "item")
+            return await executor.get_texts(elements)
+        return asyncio.run(run())
+
+    def test_results_keep_element_order(self):
+        texts = self.read_all_texts(AsyncCommandExecutor(self.driver))
+        self.assertEqual(texts, [f"text-{i}" for i in range(ELEMENT_COUNT)])
+
+    def test_concurrency_is_bounded(self):
+        self.read_all_texts(AsyncCommandExecutor(self.driver, max_concurrency=3))
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+
+    def test_executor_is_shared_per_driver(self):
+        executor = get_executor(self.driver)
+        self.assertIs(get_executor(self.driver), executor)
+        close_executor(self.driver)
+        self.assertIsNot(get_executor(self.driver), executor)
+
+    def test_requests_are_limited_to_remaining_budget(self):
+        start_deadline(0.05)
+        # 下标为负的元素在桩服务中响应很慢（约0.5秒）
+        slow = SimpleNamespace(id="-38")
+        started = time.monotonic()
+        # 请求超时发生在预算用尽之后，以带耗时报告的DeadlineExceeded上报
+        with self.assertRaisesRegex(DeadlineExceeded, "get_texts") as context:
+            asyncio.run(AsyncCommandExecutor(self.driver).get_texts([slow]))
+        self.assertLess(time.monotonic() - started, 0.45)
+        self.assertIsInstance(context.exception.__cause__, urllib3.exceptions.HTTPError)
+
+    def test_exhausted_budget_stops_reads(self):
+        start_deadline(0)
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(AsyncCommandExecutor(self.driver).get_attributes([SimpleNamespace(id="0")], "text"))
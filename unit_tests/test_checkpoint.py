@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+
+from config import QUARANTINE_MIN_RUNS
+from utils.checkpoint import FlakeStats, checkpoint_step, end_session, start_session
+from utils.deadline import DeadlineExceeded, end_deadline, start_deadline
+
+
+class FakeDriver:
+    pass
+
+
+class FakePage:
+    """
+    按预设次数失败的假页面对象，记录每次调用和导航。
+    """
+
+    def __init__(self, driver, failures=None):
+        self.driver = driver
+        self.failures = dict(failures or {})
+        self.calls = []
+        self.screen = "home"
+        self.navigations = []
+
+    def current_screen(self):
+        return self.screen
+
+    def navigate_to(self, screen, graph=None):
+        self.navigations.append(screen)
+        self.screen = screen
+
+    @checkpoint_step
+    def tap(self, name):
+        self.calls.append(name)
+        # 失败的操作会把界面带到别处，重试前需要恢复检查点
+        if self.failures.get(name, 0) > 0:
+            self.failures[name] -= 1
+            self.screen = "elsewhere"
+            raise RuntimeError(f"{name}点击失败")
+        return name
+
+    @checkpoint_step
+    def open_course(self):
+        self.calls.append("open_course")
+        self.tap("list")
+        return self.tap("course")
+
+    @checkpoint_step
+    def pick(self, index):
+        self.calls.append(index)
+        if index >= 3:
+            raise IndexError("无效的icon索引")
+        return index
+
+    @checkpoint_step
+    def time_out(self):
+        self.calls.append("time_out")
+        raise DeadlineExceeded("时间预算用尽")
+
+
+class TestCheckpointSession(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.stats = FlakeStats(os.path.join(self.temp_dir.name, "flake_stats.json"))
+        self.driver = FakeDriver()
+
+    def tearDown(self):
+        end_session(self.driver)
+        self.temp_dir.cleanup()
+
+    def test_retry_then_pass_records_flaky(self):
+        session = start_session(self.driver, retry_budget=3, stats=self.stats)
+        page = FakePage(self.driver, {"ok": 1})
+        self.assertEqual(page.tap("ok"), "ok")
+        self.assertEqual(page.calls, ["ok", "ok"])
+        self.assertEqual(page.navigations, ["home"])
+        self.assertEqual(session.retries_left, 2)
+        self.assertEqual(self.stats.steps["FakePage.tap(ok)"],
+                         {"runs": 1, "flaky": 1, "failed": 0, "failed_attempts": 1})
+
+    def test_budget_exhaustion_reraises_original_error(self):
+        start_session(self.driver, retry_budget=1, stats=self.stats)
+        page = FakePage(self.driver, {"ok": 5})
+        with self.assertRaisesRegex(RuntimeError, "ok点击失败"):
+            page.tap("ok")
+        self.assertEqual(page.calls, ["ok", "ok"])
+        self.assertEqual(self.stats.steps["FakePage.tap(ok)"]["failed"], 1)
+
+    def test_quarantined_step_raises_skip_test(self):
+        self.stats.steps["FakePage.tap(ok)"] = {"runs": 10, "flaky": 5, "failed": 0, "failed_attempts": 5}
+        start_session(self.driver, stats=self.stats)
+        page = FakePage(self.driver, {"ok": 1})
+        with self.assertRaises(unittest.SkipTest):
+            page.tap("ok")
+        self.assertEqual(page.calls, ["ok"])
+
+    def test_always_failing_step_is_not_quarantined(self):
+        for _ in range(QUARANTINE_MIN_RUNS + 2):
+            start_session(self.driver, retry_budget=1, stats=self.stats)
+            # SkipTest也是Exception，这里捕获后再检查类型，避免被隔离时整个测试被跳过
+            with self.assertRaises(Exception) as context:
+                FakePage(self.driver, {"ok": 5}).tap("ok")
+            self.assertIsInstance(context.exception, RuntimeError)
+            end_session(self.driver)
+        self.assertEqual(self.stats.steps["FakePage.tap(ok)"]["failed"], QUARANTINE_MIN_RUNS + 2)
+
+    def test_deterministic_error_is_not_retried(self):
+        session = start_session(self.driver, retry_budget=3, stats=self.stats)
+        page = FakePage(self.driver)
+        with self.assertRaisesRegex(IndexError, "无效的icon索引"):
+            page.pick(5)
+        self.assertEqual(page.calls, [5])
+        self.assertEqual(page.navigations, [])
+        self.assertEqual(session.retries_left, 3)
+        self.assertEqual(self.stats.steps["FakePage.pick(5)"],
+                         {"runs": 1, "flaky": 0, "failed": 1, "failed_attempts": 1})
+
+    def test_nested_steps_are_not_checkpointed(self):
+        session = start_session(self.driver, retry_budget=3, stats=self.stats)
+        page = FakePage(self.driver, {"course": 1})
+        self.assertEqual(page.open_course(), "course")
+        # 内层步骤失败时整个外层步骤从检查点重新执行
+        self.assertEqual(page.calls, ["open_course", "list", "course", "open_course", "list", "course"])
+        self.assertEqual(list(self.stats.steps), ["FakePage.open_course()"])
+        self.assertEqual(session.depth, 0)
+
+    def test_deadline_exceeded_is_not_retried(self):
+        session = start_session(self.driver, retry_budget=3, stats=self.stats)
+        page = FakePage(self.driver)
+        with self.assertRaises(DeadlineExceeded):
+            page.time_out()
+        self.assertEqual(page.calls, ["time_out"])
+        self.assertEqual(session.retries_left, 3)
+
+    def test_failure_after_budget_is_used_up_is_not_retried(self):
+        session = start_session(self.driver, retry_budget=3, stats=self.stats)
+        start_deadline(0)
+        page = FakePage(self.driver, {"ok": 1})
+        try:
+            with self.assertRaises(DeadlineExceeded) as context:
+                page.tap("ok")
+        finally:
+            end_deadline()
+        self.assertIsInstance(context.exception.__cause__, RuntimeError)
+        self.assertEqual(page.calls, ["ok"])
+        self.assertEqual(session.retries_left, 3)
+
+    def test_without_session_steps_run_directly(self):
+        page = FakePage(self.driver, {"ok": 1})
+        with self.assertRaises(RuntimeError):
+            page.tap("ok")
+        self.assertEqual(self.stats.steps, {})
+
+    def test_end_session_saves_stats(self):
+        start_session(self.driver, stats=self.stats)
+        FakePage(self.driver).tap("ok")
+        end_session(self.driver)
+        self.assertEqual(FlakeStats(self.stats.path).steps["FakePage.tap(ok)"]["runs"], 1)
@@ -0,0 +1,108 @@
+import importlib.util
+import subprocess
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from config import COMMAND_TIMEOUT, IMPLICIT_WAIT_TIME
+from page_objects.base_page import BasePage
+from utils.deadline import (DeadlineExceeded, end_deadline, fit_timeout, raise_if_expired, set_command_timeout,
+                            start_deadline)
+
+
+class FakeDriver:
+    """
+    记录隐式等待设置的假driver，命令超时保存在与新版本selenium相同的位置。
+    """
+
+    def __init__(self, find_delay=0):
+        self.command_executor = SimpleNamespace(_client_config=SimpleNamespace(timeout=COMMAND_TIMEOUT))
+        self.implicit_waits = []
+        self.find_delay = find_delay
+        self.current_package = "app"
+
+    def implicitly_wait(self, seconds):
+        self.implicit_waits.append(seconds)
+
+    def find_element(self, by, value):
+        # 模拟按隐式等待时长找不到元素
+        time.sleep(self.find_delay)
+        raise LookupError(f"找不到元素{by}={value}")
+
+
+class TestDeadline(unittest.TestCase):
+    def tearDown(self):
+        end_deadline()
+
+    def test_fit_timeout_without_deadline_returns_timeout(self):
+        self.assertEqual(fit_timeout("step", 15), 15)
+        self.assertIsNone(fit_timeout("step"))
+
+    def test_fit_timeout_is_clamped_to_remaining_budget(self):
+        start_deadline(5)
+        self.assertEqual(fit_timeout("step", 1), 1)
+        self.assertLessEqual(fit_timeout("step", 15), 5)
+
+    def test_exhausted_budget_reports_steps(self):
+        start_deadline(0.01)
+        fit_timeout("slow_step")
+        time.sleep(0.02)
+        with self.assertRaisesRegex(DeadlineExceeded, "slow_step"):
+            fit_timeout("next_step")
+
+    def test_raise_if_expired_only_after_budget_is_used_up(self):
+        error = TimeoutError("timed out")
+        raise_if_expired(error)
+        start_deadline(5)
+        raise_if_expired(error)
+        start_deadline(0.01)
+        fit_timeout("slow_command")
+        time.sleep(0.02)
+        with self.assertRaisesRegex(DeadlineExceeded, "slow_command") as context:
+            raise_if_expired(error)
+        self.assertIs(context.exception.__cause__, error)
+
+    def test_find_element_timing_out_on_budget_raises_deadline_exceeded(self):
+        start_deadline(0.05)
+        with self.assertRaisesRegex(DeadlineExceeded, r"find_element\(id=ok\)") as context:
+            BasePage(FakeDriver(find_delay=0.1)).find_element("id", "ok")
+        self.assertIsInstance(context.exception.__cause__, LookupError)
+
+    def test_find_element_failing_within_budget_keeps_original_error(self):
+        start_deadline(5)
+        with self.assertRaises(LookupError):
+            BasePage(FakeDriver()).find_element("id", "ok")
+
+    def test_adb_timeout_on_budget_raises_deadline_exceeded(self):
+        def check_output(command, shell, timeout):
+            time.sleep(timeout)
+            raise subprocess.TimeoutExpired(command, timeout)
+
+        start_deadline(0.05)
+        with mock.patch("page_objects.base_page.subprocess.check_output", side_effect=check_output):
+            with self.assertRaisesRegex(DeadlineExceeded, "adb shell") as context:
+                BasePage(FakeDriver()).check_app_permission("android.permission.CAMERA")
+        self.assertIsInstance(context.exception.__cause__, subprocess.TimeoutExpired)
+
+    def test_command_timeout_follows_remaining_budget(self):
+        driver = FakeDriver()
+        start_deadline(5)
+        self.assertEqual(BasePage(driver)._fit_command_timeout("go_back", 1), 1)
+        self.assertLessEqual(driver.command_executor._client_config.timeout, 5)
+        set_command_timeout(driver)
+        self.assertEqual(driver.command_executor._client_config.timeout, COMMAND_TIMEOUT)
+
+    def test_command_timeout_on_old_selenium(self):
+        timeouts = []
+        driver = SimpleNamespace(command_executor=SimpleNamespace(set_timeout=timeouts.append))
+        set_command_timeout(driver, 3)
+        self.assertEqual(timeouts, [3])
+
+    @unittest.skipIf(importlib.util.find_spec("selenium") is None, "未安装selenium")
+    def test_explicit_wait_disables_implicit_wait(self):
+        driver = FakeDriver()
+        with BasePage(driver)._explicit_wait("wait", 1) as wait:
+            self.assertEqual(driver.implicit_waits, [0])
+            self.assertEqual(wait._timeout, 1)
+        self.assertEqual(driver.implicit_waits, [0, IMPLICIT_WAIT_TIME])
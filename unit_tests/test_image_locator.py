@@ -0,0 +1,154 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from config import IMAGE_LOCATE_TIME_BUDGET
+
+try:
+    import numpy as np
+    from PIL import Image
+    from utils import image_locator
+except ImportError:  # 图片定位是可选功能，未安装numpy或Pillow时跳过
+    image_locator = None
+
+SCREEN_SHAPE = (2400, 1080)
+
+
+def make_icon(rng, size=120, block=10):
+    # 随机色块组成的icon，纹理足够丰富，不同icon之间互不相似
+    cells = size // block
+    return rng.integers(0, 255, (cells, cells)).repeat(block, 0).repeat(block, 1).astype(np.float32)
+
+
+def make_outline_icon(size, stroke=2):
+    # 白底细线框加十字的线性图标，缩小到金字塔顶层后线条容易被抹平
+    icon = np.full((size, size), 255, np.float32)
+    icon[:stroke] = icon[-stroke:] = 60
+    icon[:, :stroke] = icon[:, -stroke:] = 60
+    center = size // 2 - stroke // 2
+    icon[center:center + stroke, size // 4:3 * size // 4] = 60
+    icon[size // 4:3 * size // 4, center:center + stroke] = 60
+    return icon
+
+
+def make_circle_icon(size):
+    yy, xx = np.mgrid[:size, :size] - (size - 1) / 2
+    icon = np.full((size, size), 255, np.float32)
+    icon[yy ** 2 + xx ** 2 <= (size / 2 - 1) ** 2] = 40
+    return icon
+
+
+def to_png(image):
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(image, 0, 255).astype(np.uint8)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@unittest.skipIf(image_locator is None, "未安装numpy或Pillow")
+class TestImageLocator(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.screen = np.full(SCREEN_SHAPE, 240, np.float32) + self.rng.normal(0, 3, SCREEN_SHAPE).astype(np.float32)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def save_template(self, name, icon):
+        path = os.path.join(self.temp_dir.name, name)
+        Image.fromarray(icon.astype(np.uint8)).save(path)
+        return path
+
+    def place(self, icon, x, y, scale=1.0):
+        size = int(round(icon.shape[0] * scale))
+        self.screen[y:y + size, x:x + size] = image_locator.resize(icon, size, size)
+
+    def test_resize_interpolates_linearly(self):
+        image = np.array([[0, 10]], dtype=np.float32)
+        np.testing.assert_allclose(image_locator.resize(image, 1, 3), [[0, 5, 10]])
+        np.testing.assert_allclose(image_locator.resize(image, 2, 2), [[0, 10], [0, 10]])
+
+    def test_normalize_scores_exact_inverted_and_flat_windows(self):
+        template = self.rng.random((5, 5)) * 255
+        zero_mean, norm = image_locator._prepare(template)
+        n = template.size
+
+        def score(window):
+            corr = np.array([[(window * zero_mean).sum()]])
+            return float(image_locator._normalize(corr, np.array([[window.sum()]]),
+                                                  np.array([[(window ** 2).sum()]]), n, norm)[0, 0])
+
+        self.assertAlmostEqual(score(template), 1.0, places=6)
+        self.assertAlmostEqual(score(2 * template + 7), 1.0, places=6)
+        self.assertAlmostEqual(score(255 - template), -1.0, places=6)
+        self.assertEqual(score(np.full((5, 5), 42.0)), 0)
+
+    def test_non_max_suppression_keeps_best_non_overlapping(self):
+        Match = image_locator.Match
+        matches = [Match(0, 0, 10, 10, 0.9), Match(3, 3, 10, 10, 0.95), Match(50, 50, 10, 10, 0.8)]
+        kept = image_locator._non_max_suppression(matches, max_matches=5)
+        self.assertEqual(kept, [Match(3, 3, 10, 10, 0.95), Match(50, 50, 10, 10, 0.8)])
+        self.assertEqual(image_locator._non_max_suppression(matches, max_matches=1), [Match(3, 3, 10, 10, 0.95)])
+
+    def test_locate_finds_scaled_and_repeated_icons(self):
+        first, second, absent = make_icon(self.rng), make_icon(self.rng), make_icon(self.rng)
+        self.place(first, 103, 211)
+        self.place(second, 600, 1500, scale=1.1)
+        self.place(second, 200, 1900, scale=1.1)
+        paths = [self.save_template(name, icon) for name, icon in
+                 (("first.png", first), ("second.png", second), ("absent.png", absent))]
+
+        results = image_locator.locate(image_locator.to_gray(to_png(self.screen)), paths, max_matches=2)
+
+        self.assertEqual([(m.x, m.y, m.width) for m in results[paths[0]]], [(103, 211, 120)])
+        self.assertEqual(sorted((m.x, m.y, m.width) for m in results[paths[1]]),
+                         [(200, 1900, 132), (600, 1500, 132)])
+        self.assertEqual(results[paths[2]], [])
+        self.assertEqual(results[paths[0]][0].center, (163, 271))
+
+    def test_small_templates_use_fewer_pyramid_levels(self):
+        path = self.save_template("small.png", make_outline_icon(32))
+        levels = [prepared[-1] for prepared in image_locator.load_template(path, scales=(1.0,), levels=2)]
+        self.assertEqual(levels, [1])
+
+    def test_locate_finds_thin_icons_at_every_grid_offset(self):
+        # 同一图标在一帧中出现16次，分别覆盖相对于顶层像素网格(4像素)的所有偏移
+        for name, icon in (("outline48.png", make_outline_icon(48)), ("outline32.png", make_outline_icon(32)),
+                           ("circle48.png", make_circle_icon(48))):
+            with self.subTest(name):
+                self.screen[:] = 250
+                expected = set()
+                for k in range(16):
+                    col, row = k % 4, k // 4
+                    # 251除以4余3、501除以4余1，x偏移依次为0、3、2、1，y偏移依次为0、1、2、3
+                    x, y = 100 + col * 251, 200 + row * 501
+                    self.place(icon, x, y)
+                    expected.add((x, y))
+                path = self.save_template(name, icon)
+                results = image_locator.locate(self.screen.copy(), [path], max_matches=16)[path]
+                self.assertEqual({(m.x, m.y) for m in results}, expected)
+
+    def test_locating_a_dozen_icons_stays_within_budget(self):
+        paths, expected = [], {}
+        for k in range(12):
+            icon = make_icon(self.rng)
+            x, y = 50 + (k % 4) * 250, 100 + (k // 4) * 500
+            self.place(icon, x, y, scale=1.1)
+            path = self.save_template(f"icon{k}.png", icon)
+            paths.append(path)
+            expected[path] = (x, y)
+        png = to_png(self.screen)
+        # 第一次调用包含模板预处理，之后复用缓存，与实际测试中多次定位的情形一致
+        image_locator.locate(image_locator.to_gray(png), paths)
+
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            results = image_locator.locate(image_locator.to_gray(png), paths)
+            timings.append(time.perf_counter() - started)
+
+        self.assertEqual({path: (m[0].x, m[0].y) for path, m in results.items() if m}, expected)
+        # 取多次中的最小值，减少机器负载带来的波动
+        self.assertLess(min(timings), IMAGE_LOCATE_TIME_BUDGET)
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from config import IMPORT_TIME_BUDGET, LIST_TIME_BUDGET
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入页面对象和测试模块、列出测试时不应加载的重量级依赖
+HEAVY_MODULES = ("appium", "selenium", "urllib3", "numpy", "PIL")
+
+# 在新的解释器中导入全部页面对象和测试模块，输出耗时和已加载的模块
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import page_objects.home_page, page_objects.login, page_objects.start
+import tests.test_icon_click, tests.test_check_courselist
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+# 在新的解释器中执行main.py --list，测试发现缓存写到参数指定的路径，输出耗时、列出的测试和已加载的模块
+LIST_PROBE = """
+import contextlib, io, json, runpy, sys, time
+import config
+config.DISCOVERY_CACHE_PATH = sys.argv[1]
+sys.argv = ["main.py", "--list"]
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()) as output:
+    runpy.run_path("main.py", run_name="__main__")
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "tests": output.getvalue().split(), "modules": sorted(sys.modules)}))
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    def run_probe(self, probe, *args):
+        output = subprocess.check_output([sys.executable, "-c", probe, *args], cwd=ROOT_DIR)
+        return json.loads(output)
+
+    def assert_no_heavy_modules(self, modules):
+        loaded = [name for name in modules if name.split(".")[0] in HEAVY_MODULES]
+        self.assertEqual(loaded, [], f"加载了重量级依赖: {loaded}")
+
+    def test_heavy_dependencies_are_deferred(self):
+        self.assert_no_heavy_modules(self.run_probe(IMPORT_PROBE)["modules"])
+
+    def test_import_time_within_budget(self):
+        # 取多次中的最小值，减少机器负载带来的波动
+        elapsed = min(self.run_probe(IMPORT_PROBE)["elapsed"] for _ in range(3))
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET, f"导入耗时{elapsed:.3f}秒，超过预算{IMPORT_TIME_BUDGET}秒")
+
+    def test_listing_tests_within_budget(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "discovery.json")
+            # 第一次运行建立测试发现缓存，之后的运行复用缓存
+            runs = [self.run_probe(LIST_PROBE, cache_path) for _ in range(3)]
+            self.assertTrue(os.path.exists(cache_path))
+
+        self.assertIn("tests.test_icon_click.TestIconClick.test_all_icons_clickable", runs[0]["tests"])
+        self.assertTrue(all(run["tests"] == runs[0]["tests"] for run in runs))
+        self.assert_no_heavy_modules(runs[-1]["modules"])
+        elapsed = min(run["elapsed"] for run in runs)
+        self.assertLess(elapsed, LIST_TIME_BUDGET, f"列出测试耗时{elapsed:.3f}秒，超过预算{LIST_TIME_BUDGET}秒")
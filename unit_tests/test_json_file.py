@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.checkpoint import FlakeStats
+from utils.discovery import discover_tests
+from utils.json_file import load_json, save_json
+from utils.result_cache import ResultCache
+
+
+class TestJsonFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache", "results.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_raw(self, text):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_missing_truncated_or_mistyped_file_loads_default(self):
+        self.assertEqual(load_json(self.path, {}), {})
+        self.write_raw('{"tests.test_a": {"apk": ')
+        self.assertEqual(load_json(self.path, {}), {})
+        self.write_raw("[1, 2]")
+        self.assertEqual(load_json(self.path, {}), {})
+
+    def test_save_creates_directory_and_round_trips(self):
+        save_json(self.path, {"键": [1, 2]})
+        self.assertEqual(load_json(self.path, {}), {"键": [1, 2]})
+
+    def test_interrupted_save_keeps_previous_file(self):
+        save_json(self.path, {"version": 1})
+        with mock.patch("utils.json_file.json.dump", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                save_json(self.path, {"version": 2})
+        self.assertEqual(load_json(self.path, {}), {"version": 1})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["results.json"])
+
+    def test_caches_treat_truncated_files_as_empty(self):
+        self.write_raw('{"truncated": ')
+        self.assertEqual(ResultCache(self.path).entries, {})
+        self.assertEqual(FlakeStats(self.path).steps, {})
+
+        tests_dir = os.path.join(self.temp_dir.name, "tests")
+        os.makedirs(tests_dir)
+        with open(os.path.join(tests_dir, "test_sample.py"), "w", encoding="utf-8") as f:
+            f.write("import unittest\n\nclass TestSample(unittest.TestCase):\n    def test_one(self):\n        pass\n")
+        self.assertEqual(discover_tests(tests_dir, self.path), ["tests.test_sample.TestSample.test_one"])
+        with open(self.path, encoding="utf-8") as f:
+            self.assertIn("test_sample.py", json.load(f))
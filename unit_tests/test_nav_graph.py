@@ -0,0 +1,195 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+from utils.nav_graph import AppCrawler, ScreenGraph, matches_locator, screen_fingerprint, screen_markers
+
+LIST_SCREEN = """<hierarchy>
+  <android.widget.FrameLayout package="app" resource-id="app:id/root" bounds="[0,0][1080,2400]">
+    <android.widget.TextView resource-id="app:id/title" text="课程" clickable="false"/>
+    <android.widget.LinearLayout resource-id="app:id/item" clickable="true" text="第一课"/>
+    <android.widget.LinearLayout resource-id="app:id/item" clickable="true" text="第二课"/>
+    <android.widget.ImageView content-desc="设置" clickable="true"/>
+    <android.widget.Button resource-id="app:id/ok" clickable="true"/>
+    <android.widget.ImageView clickable="true"/>
+    <android.widget.LinearLayout resource-id="app:id/menu" clickable="true">
+      <android.widget.TextView text="退出登录"/>
+    </android.widget.LinearLayout>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+
+def screen(*items, text="课程", bounds="[0,0][1080,2400]"):
+    rows = "".join(f'<android.widget.LinearLayout resource-id="app:id/{item}"/>' for item in items)
+    return (f'<hierarchy><android.widget.FrameLayout package="app" bounds="{bounds}">'
+            f'<android.widget.TextView text="{text}"/>{rows}</android.widget.FrameLayout></hierarchy>')
+
+
+class TestScreenFingerprint(unittest.TestCase):
+    def test_ignores_text_and_bounds(self):
+        self.assertEqual(screen_fingerprint(screen("item")),
+                         screen_fingerprint(screen("item", text="首页", bounds="[0,0][720,1280]")))
+
+    def test_collapses_repeated_siblings(self):
+        self.assertEqual(screen_fingerprint(screen("item")), screen_fingerprint(screen("item", "item", "item")))
+
+    def test_differs_on_structure(self):
+        self.assertNotEqual(screen_fingerprint(screen("item")), screen_fingerprint(screen("item", "footer")))
+
+
+class TestScreenGraph(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.graph = ScreenGraph(os.path.join(self.temp_dir.name, "graph.json"))
+        self.graph.add_edge("a", "b", {"type": "click", "by": "id", "value": "to_b"}, 1.0)
+        self.graph.add_edge("b", "c", {"type": "click", "by": "id", "value": "to_c"}, 1.0)
+        self.graph.add_edge("a", "c", {"type": "click", "by": "id", "value": "slow"}, 5.0)
+        self.graph.add_edge("c", "d", {"type": "swipe", "direction": "up"}, 0.5)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_shortest_path_prefers_lower_cost(self):
+        path = self.graph.shortest_path("a", "c")
+        self.assertEqual([edge["action"]["value"] for edge in path], ["to_b", "to_c"])
+
+    def test_shortest_path_to_itself_is_empty(self):
+        self.assertEqual(self.graph.shortest_path("b", "b"), [])
+
+    def test_shortest_path_unreachable_is_none(self):
+        self.assertIsNone(self.graph.shortest_path("d", "a"))
+        self.assertIsNone(self.graph.shortest_path("a", "unknown"))
+
+    def test_resolves_names_and_activities(self):
+        self.graph.label("c", "course_list")
+        self.graph.record_activity("b", ".activity.CourseActivity")
+        self.graph.record_activity("d", "app.activity.CourseActivity")
+        self.assertEqual(self.graph.resolve("course_list"), {"c"})
+        self.assertEqual(self.graph.resolve("CourseActivity"), {"b", "d"})
+        self.assertEqual(self.graph.resolve(".activity.CourseActivity"), {"b", "d"})
+        self.assertEqual(self.graph.resolve("Activity"), {"Activity"})
+        # 同一Activity有多个界面时到达最近的一个即可
+        self.assertEqual(len(self.graph.shortest_path("a", "CourseActivity")), 1)
+
+    def test_save_and_reload(self):
+        self.graph.label("a", "home")
+        self.graph.record_activity("a", ".MainActivity")
+        self.graph.save()
+        reloaded = ScreenGraph(self.graph.path)
+        self.assertEqual((reloaded.names, reloaded.activities, reloaded.edges),
+                         (self.graph.names, self.graph.activities, self.graph.edges))
+
+
+class TestCandidateActions(unittest.TestCase):
+    def test_extracts_clickable_elements_and_swipes(self):
+        self.assertEqual(AppCrawler.candidate_actions(LIST_SCREEN), [
+            {"type": "click", "by": "xpath", "value": "(//*[@resource-id='app:id/item'])[1]"},
+            {"type": "click", "by": "xpath", "value": "(//*[@resource-id='app:id/item'])[2]"},
+            {"type": "click", "by": "accessibility id", "value": "设置"},
+            {"type": "click", "by": "id", "value": "app:id/ok"},
+            {"type": "click", "by": "id", "value": "app:id/menu"},
+            {"type": "swipe", "direction": "up"},
+            {"type": "swipe", "direction": "down"},
+            {"type": "swipe", "direction": "left"},
+            {"type": "swipe", "direction": "right"},
+        ])
+
+    def test_excluded_elements_are_not_clicked(self):
+        actions = AppCrawler.candidate_actions(LIST_SCREEN, excluded=[("text", "退出"), ("accessibility id", "设置"),
+                                                                      ("id", "app:id/ok")])
+        self.assertNotIn({"type": "click", "by": "id", "value": "app:id/menu"}, actions)
+        self.assertNotIn({"type": "click", "by": "accessibility id", "value": "设置"}, actions)
+        self.assertNotIn({"type": "click", "by": "id", "value": "app:id/ok"}, actions)
+        self.assertEqual(len(actions), 6)
+
+    def test_excluding_one_repeated_id_keeps_xpath_indexes(self):
+        screen = ('<hierarchy><android.widget.FrameLayout>'
+                  '<android.widget.LinearLayout resource-id="app:id/item" clickable="true" text="删除"/>'
+                  '<android.widget.LinearLayout resource-id="app:id/item" clickable="true" text="查看"/>'
+                  '</android.widget.FrameLayout></hierarchy>')
+        clicks = [a for a in AppCrawler.candidate_actions(screen, excluded=[("text", "删除")]) if a["type"] == "click"]
+        self.assertEqual(clicks, [{"type": "click", "by": "xpath", "value": "(//*[@resource-id='app:id/item'])[2]"}])
+
+    def test_matches_locator_rejects_unsupported_strategy(self):
+        with self.assertRaises(ValueError):
+            matches_locator(ET.fromstring(LIST_SCREEN), "xpath", "//*")
+
+    def test_screen_markers(self):
+        markers = {"list": ("id", "app:id/title"), "settings": ("accessibility id", "设置"),
+                   "login": ("id", "app:id/login")}
+        self.assertEqual(screen_markers(LIST_SCREEN, markers), ["list", "settings"])
+        with self.assertRaises(ValueError):
+            screen_markers(LIST_SCREEN, {"list": ("xpath", "//*")})
+
+
+class FakePage:
+    """
+    按预设的跳转表切换界面的假页面对象，记录执行过的操作。
+    """
+
+    def __init__(self, screen, transitions):
+        self.screen = screen
+        self.transitions = transitions
+        self.performed = []
+        self.driver = SimpleNamespace(page_source=LIST_SCREEN, current_activity=".MainActivity")
+
+    def current_screen(self):
+        return self.screen
+
+    def perform_action(self, action):
+        self.performed.append(action)
+        key = action.get("direction") or action["type"]
+        self.screen = self.transitions.get((self.screen, key), self.screen)
+        return 0.1
+
+    def navigate_to(self, screen, graph=None):
+        raise Exception("不可达")
+
+
+class TestReturnTo(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.graph = ScreenGraph(os.path.join(self.temp_dir.name, "graph.json"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_swipe_is_undone_with_opposite_swipe(self):
+        page = FakePage("second", {("second", "right"): "first", ("second", "back"): "exit"})
+        crawler = AppCrawler(page, self.graph)
+        self.assertTrue(crawler._return_to("first", {"type": "swipe", "direction": "left"}))
+        self.assertEqual(page.performed, [{"type": "swipe", "direction": "right"}])
+        self.assertEqual(self.graph.edges["second"][0]["to"], "first")
+
+    def test_falls_back_to_back_when_undo_does_not_return(self):
+        page = FakePage("detail", {("detail", "back"): "list"})
+        crawler = AppCrawler(page, self.graph)
+        self.assertTrue(crawler._return_to("list", {"type": "swipe", "direction": "up"}))
+        self.assertEqual(page.performed, [{"type": "swipe", "direction": "down"}, {"type": "back"}])
+
+    def test_click_returns_with_back(self):
+        page = FakePage("detail", {("detail", "back"): "list"})
+        crawler = AppCrawler(page, self.graph)
+        self.assertTrue(crawler._return_to("list", {"type": "click", "by": "id", "value": "open"}))
+        self.assertEqual(page.performed, [{"type": "back"}])
+
+    def test_reports_failure_when_source_unreachable(self):
+        page = FakePage("detail", {})
+        crawler = AppCrawler(page, self.graph)
+        self.assertFalse(crawler._return_to("list", {"type": "click", "by": "id", "value": "open"}))
+
+    def test_crawl_records_activity_and_markers(self):
+        page = FakePage("list", {})
+        crawler = AppCrawler(page, self.graph, max_actions=0, markers={"courses": ("id", "app:id/title")})
+        crawler.crawl()
+        self.assertEqual(self.graph.activities, {"list": ".MainActivity"})
+        self.assertEqual(self.graph.resolve("courses"), {"list"})
+        self.assertTrue(os.path.exists(self.graph.path))
+
+    def test_crawl_skips_excluded_elements(self):
+        page = FakePage("list", {})
+        AppCrawler(page, self.graph, excluded=[("text", "退出")]).crawl()
+        self.assertNotIn({"type": "click", "by": "id", "value": "app:id/menu"}, page.performed)
+        self.assertIn({"type": "click", "by": "id", "value": "app:id/ok"}, page.performed)
@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.dependencies import dependency_recorder
+from utils.result_cache import CachedTestRunner, ResultCache, module_dependencies
+
+
+class FakePage:
+    pass
+
+
+# 伪装成页面对象，使依赖记录器把它所在的模块记为依赖
+FakePage.__module__ = "page_objects.home_page"
+
+
+class SampleTests(unittest.TestCase):
+    """
+    由TestResultCache驱动执行的示例测试，记录每个测试实际执行的次数。
+    """
+
+    # 其中的失败是有意为之，不让pytest把它当作普通测试收集
+    __test__ = False
+    runs = {}
+    template_path = None
+
+    def setUp(self):
+        SampleTests.runs[self._testMethodName] = SampleTests.runs.get(self._testMethodName, 0) + 1
+        if self._testMethodName == "test_connection_error":
+            raise ConnectionError("Appium服务未启动")
+
+    def test_passes(self):
+        dependency_recorder.record(FakePage(), "id", "ok")
+        dependency_recorder.record_file(SampleTests.template_path)
+
+    def test_fails(self):
+        dependency_recorder.record(FakePage(), "id", "ok")
+        self.fail("断言失败")
+
+    def test_connection_error(self):
+        pass
+
+    def test_without_page_objects(self):
+        pass
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "results.json")
+        SampleTests.template_path = os.path.join(self.temp_dir.name, "icon.png")
+        with open(SampleTests.template_path, "wb") as f:
+            f.write(b"icon-v1")
+        SampleTests.runs = {}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_suite(self, force=False):
+        runner = CachedTestRunner(force=force, stream=io.StringIO())
+        runner.cache = ResultCache(self.cache_path)
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(SampleTests)
+        with mock.patch("utils.result_cache.apk_fingerprint", return_value="apk-1"):
+            return runner.run(suite)
+
+    def test_only_passed_results_with_dependencies_are_reused(self):
+        self.run_suite()
+        result = self.run_suite()
+        self.assertEqual(SampleTests.runs, {"test_passes": 1, "test_fails": 2,
+                                            "test_connection_error": 2, "test_without_page_objects": 2})
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(len(result.failures), 1)
+        self.assertEqual(len(result.skipped), 1)
+        self.assertEqual(set(ResultCache(self.cache_path).entries), {SampleTests("test_passes").id()})
+
+    def test_changed_template_file_invalidates_result(self):
+        self.run_suite()
+        with open(SampleTests.template_path, "wb") as f:
+            f.write(b"icon-v2")
+        self.run_suite()
+        self.assertEqual(SampleTests.runs["test_passes"], 2)
+
+    def test_force_reruns_everything(self):
+        self.run_suite()
+        self.run_suite(force=True)
+        self.assertEqual(SampleTests.runs["test_passes"], 2)
+
+    def test_entry_includes_utils_modules_used_by_page_objects(self):
+        self.run_suite()
+        entry = ResultCache(self.cache_path).entries[SampleTests("test_passes").id()]
+        self.assertIn("utils.checkpoint", entry["modules"])
+        self.assertIn(os.path.abspath(SampleTests.template_path), entry["files"])
+        self.assertTrue({"utils.image_locator", "utils.nav_graph", "utils.deadline"}
+                        <= module_dependencies({"page_objects.base_page"}))
+
+
+def load_tests(loader, tests, pattern):
+    # SampleTests只由TestResultCache驱动执行，unittest收集时同样跳过
+    return loader.loadTestsFromTestCase(TestResultCache)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import weakref
+
+from config import ASYNC_MAX_CONCURRENCY, COMMAND_TIMEOUT, HTTP_POOL_SIZE
+from utils.deadline import fit_timeout, raise_if_expired
+
+# W3C协议中元素引用的键名
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# driver到执行器的映射，同一个driver上的所有页面对象共用一个执行器和连接池
+_executors = weakref.WeakKeyDictionary()
+
+
+class AsyncCommandExecutor:
+    """
+    基于asyncio的WebDriver命令执行器。
+
+    同步的selenium远程连接一次只发送一个请求，彼此独立的读取操作（如多个元素的文本、属性）会被串行执行。
+    本执行器复用同一个driver会话，通过带keep-alive的urllib3连接池发送请求，
+    并用信号量限制同时在途的请求数量，使这类读取操作可以并发执行。
+    """
+
+    def __init__(self, driver, max_concurrency=ASYNC_MAX_CONCURRENCY, pool_size=HTTP_POOL_SIZE):
+        """
+        构造函数：初始化异步命令执行器
+
+        参数:
+        - driver: 已建立会话的Appium驱动实例
+        - max_concurrency: 同时在途的最大请求数
+        - pool_size: 连接池中保持的长连接数量
+        """
+        # urllib3随selenium安装，创建执行器时才导入，列出、筛选测试时不会加载
+        import urllib3
+
+        # 只保存driver的弱引用，执行器缓存不会阻止driver被回收
+        self._driver = weakref.ref(driver)
+        self.max_concurrency = max_concurrency
+        self.base_url = f"{self._get_server_url(driver).rstrip('/')}/session/{driver.session_id}"
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            block=True,
+            headers={"Content-Type": "application/json;charset=UTF-8", "Connection": "keep-alive"},
+        )
+
+    @staticmethod
+    def _get_server_url(driver):
+        # 兼容不同版本selenium中RemoteConnection保存服务器地址的方式
+        command_executor = driver.command_executor
+        client_config = getattr(command_executor, "_client_config", None)
+        if client_config is not None:
+            return client_config.remote_server_addr
+        return command_executor._url
+
+    def _request(self, method, path, payload=None, timeout=COMMAND_TIMEOUT):
+        """
+        同步发送一条WebDriver命令，在线程池中执行。
+
+        参数:
+        - timeout: 请求的超时时间（秒）
+
+        返回:
+        - 响应中的value字段
+
+        抛出:
+        Exception: 如果服务端返回错误
+        """
+        body = json.dumps(payload) if payload is not None else None
+        response = self.http.request(method, self.base_url + path, body=body, timeout=timeout)
+        data = json.loads(response.data.decode("utf-8"))
+        value = data.get("value")
+        if response.status >= 400 or (isinstance(value, dict) and "error" in value):
+            message = value.get("message") if isinstance(value, dict) else value
+            raise Exception(f"WebDriver命令执行失败: {method} {path}: {message}")
+        return value
+
+    async def execute(self, semaphore, method, path, payload=None, timeout=COMMAND_TIMEOUT):
+        """
+        在并发限制下异步执行一条WebDriver命令。
+
+        参数:
+        - semaphore: 限制并发数的信号量
+        - method: HTTP方法，如GET、POST
+        - path: 相对于会话的命令路径
+        - payload: 请求体
+        - timeout: 请求的超时时间（秒）
+
+        返回:
+        - 响应中的value字段
+
+        抛出:
+        DeadlineExceeded: 如果请求因测试的时间预算用尽而失败
+        """
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(self._request, method, path, payload, timeout)
+            except Exception as e:
+                # 请求超时被缩小到剩余预算，预算用尽导致的超时以DeadlineExceeded上报
+                raise_if_expired(e)
+                raise
+
+    async def find_elements(self, by, value):
+        """
+        异步查找一组元素，超时时间不超过测试剩余的时间预算。
+
+        返回:
+        - 元素对象列表，可以直接交给同步代码继续使用
+        """
+        timeout = fit_timeout(f"find_elements_async({by}={value})", COMMAND_TIMEOUT)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        refs = await self.execute(semaphore, "POST", "/elements", {"using": by, "value": value}, timeout)
+        driver = self._driver()
+        return [driver.create_web_element(ref[ELEMENT_KEY]) for ref in refs]
+
+    async def get_texts(self, elements):
+        """
+        并发读取一组元素的文本，返回顺序与传入顺序一致。每个请求的超时时间不超过测试剩余的时间预算。
+        """
+        timeout = fit_timeout("get_texts", COMMAND_TIMEOUT)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(
+            *(self.execute(semaphore, "GET", f"/element/{element.id}/text", timeout=timeout) for element in elements)
+        )
+
+    async def get_attributes(self, elements, name):
+        """
+        并发读取一组元素的指定属性，返回顺序与传入顺序一致。每个请求的超时时间不超过测试剩余的时间预算。
+        """
+        timeout = fit_timeout(f"get_attributes({name})", COMMAND_TIMEOUT)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(
+            *(self.execute(semaphore, "GET", f"/element/{element.id}/attribute/{name}", timeout=timeout)
+              for element in elements)
+        )
+
+    def close(self):
+        """
+        关闭连接池中的所有长连接。
+        """
+        self.http.clear()
+
+
+def get_executor(driver):
+    """
+    获取driver对应的异步命令执行器，首次调用时创建，之后复用同一个连接池。
+    """
+    executor = _executors.get(driver)
+    if executor is None:
+        executor = AsyncCommandExecutor(driver)
+        _executors[driver] = executor
+        # driver被回收时关闭连接池，防止漏掉close_executor时连接泄漏
+        weakref.finalize(driver, executor.close)
+    return executor
+
+
+def close_executor(driver):
+    """
+    关闭driver对应的执行器及其长连接，通常在driver.quit()之前调用。
+    """
+    executor = _executors.pop(driver, None)
+    if executor is not None:
+        executor.close()
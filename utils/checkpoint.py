@@ -0,0 +1,173 @@
+import functools
+import unittest
+import weakref
+
+from utils.deadline import DeadlineExceeded, raise_if_expired
+from utils.json_file import load_json, save_json
+from config import FLAKE_STATS_PATH, QUARANTINE_FLAKE_RATE, QUARANTINE_MIN_RUNS, STEP_RETRY_BUDGET
+
+# driver到检查点会话的映射，同一个driver上创建的所有页面对象共用一个会话
+_sessions = weakref.WeakKeyDictionary()
+
+# 由调用参数或代码本身决定的错误，重试也不会成功，不消耗重试预算
+# （如click_icon中的"无效的icon索引"IndexError）
+DETERMINISTIC_ERRORS = (unittest.SkipTest, AttributeError, IndexError, KeyError, NotImplementedError,
+                        TypeError, ValueError)
+
+
+class FlakeStats:
+    """
+    按步骤统计执行次数和不稳定次数，以JSON形式持久化，用于隔离长期不稳定的步骤。
+    """
+
+    def __init__(self, path=FLAKE_STATS_PATH):
+        self.path = path
+        self.steps = load_json(path, {})
+
+    def save(self):
+        save_json(self.path, self.steps)
+
+    def record(self, key, failed_attempts, passed):
+        """
+        记录一个步骤的一次执行。
+
+        参数:
+        - key: 步骤标识
+        - failed_attempts: 本次执行中失败的尝试次数
+        - passed: 最终是否成功
+        """
+        stats = self.steps.setdefault(key, {"runs": 0, "flaky": 0, "failed": 0, "failed_attempts": 0})
+        stats["runs"] += 1
+        stats["failed_attempts"] += failed_attempts
+        if not passed:
+            stats["failed"] += 1
+        elif failed_attempts:
+            stats["flaky"] += 1
+
+    def is_quarantined(self, key):
+        """
+        执行次数足够多，且重试后才成功的比例达到阈值的步骤会被隔离。
+
+        只按重试后成功的次数计算：从未成功过的步骤是确定的失败而不是不稳定，应当继续报告失败。
+        """
+        stats = self.steps.get(key)
+        if stats is None or stats["runs"] < QUARANTINE_MIN_RUNS:
+            return False
+        return stats["flaky"] / stats["runs"] >= QUARANTINE_FLAKE_RATE
+
+
+class CheckpointSession:
+    """
+    步骤级检查点会话。
+
+    每个页面对象操作都是一个步骤，执行前记录界面指纹作为检查点。步骤失败时，
+    先通过跳转图回到该检查点界面，再只重新执行这一步，整个测试共用一个重试预算。
+    """
+
+    def __init__(self, retry_budget=STEP_RETRY_BUDGET, graph=None, stats=None):
+        """
+        构造函数：初始化检查点会话
+
+        参数:
+        - retry_budget: 整个测试内允许的步骤重试总次数
+        - graph: 恢复检查点时使用的ScreenGraph，默认加载配置中的跳转图
+        - stats: 步骤不稳定统计，默认加载配置中的统计文件
+        """
+        self.retries_left = retry_budget
+        self.graph = graph
+        self.stats = stats if stats is not None else FlakeStats()
+        self.depth = 0
+
+    @staticmethod
+    def step_key(page, func, args):
+        # 步骤标识：页面类名、方法名和简单类型的参数（通常是定位器）
+        simple_args = ",".join(str(arg) for arg in args if isinstance(arg, (str, int, float)))
+        return f"{type(page).__name__}.{func.__name__}({simple_args})"
+
+    def run_step(self, page, func, args, kwargs):
+        """
+        以检查点方式执行一个步骤。
+
+        抛出:
+        unittest.SkipTest: 如果已被隔离的步骤再次失败
+        Exception: 确定性错误、重试预算用尽或无法恢复到检查点时，抛出步骤最后一次的异常
+        """
+        key = self.step_key(page, func, args)
+        checkpoint = page.current_screen()
+        failed_attempts = 0
+        while True:
+            self.depth += 1
+            try:
+                result = func(page, *args, **kwargs)
+            except DeadlineExceeded:
+                # 时间预算用尽时不再重试
+                raise
+            except DETERMINISTIC_ERRORS:
+                self.stats.record(key, failed_attempts + 1, passed=False)
+                raise
+            except Exception as e:
+                # 时间预算用尽导致的超时同样不再重试，改为上报各步骤的耗时
+                raise_if_expired(e)
+                failed_attempts += 1
+                if self.stats.is_quarantined(key):
+                    self.stats.record(key, failed_attempts, passed=False)
+                    raise unittest.SkipTest(f"步骤{key}不稳定，已被隔离: {e}")
+                if self.retries_left <= 0 or not self._restore(page, checkpoint):
+                    self.stats.record(key, failed_attempts, passed=False)
+                    raise
+                self.retries_left -= 1
+                continue
+            finally:
+                self.depth -= 1
+            self.stats.record(key, failed_attempts, passed=True)
+            return result
+
+    def _restore(self, page, checkpoint):
+        # 回到步骤执行前的界面，恢复期间的操作不再作为步骤记录
+        self.depth += 1
+        try:
+            if page.current_screen() != checkpoint:
+                page.navigate_to(checkpoint, graph=self.graph)
+            return True
+        except DeadlineExceeded:
+            # 时间预算用尽时直接上报，不当作无法恢复
+            raise
+        except Exception:
+            return False
+        finally:
+            self.depth -= 1
+
+
+def start_session(driver, **kwargs):
+    """
+    为driver开启检查点会话，之后该driver上的页面对象操作都会按步骤执行。
+    """
+    session = CheckpointSession(**kwargs)
+    _sessions[driver] = session
+    return session
+
+
+def end_session(driver):
+    """
+    结束driver的检查点会话并保存步骤不稳定统计。
+    """
+    session = _sessions.pop(driver, None)
+    if session is not None:
+        session.stats.save()
+
+
+def checkpoint_step(func):
+    """
+    装饰页面对象的操作方法，使其在检查点会话中作为一个步骤执行。
+
+    没有开启会话或处于另一个步骤内部时，直接调用原方法。
+    """
+
+    @functools.wraps(func)
+    def wrapper(page, *args, **kwargs):
+        session = _sessions.get(page.driver)
+        if session is None or session.depth > 0:
+            return func(page, *args, **kwargs)
+        return session.run_step(page, func, args, kwargs)
+
+    return wrapper
@@ -0,0 +1,166 @@
+import contextvars
+import functools
+import time
+
+from config import COMMAND_TIMEOUT, TEST_TIME_BUDGET
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(AssertionError):
+    """
+    测试的时间预算用尽。继承AssertionError，使unittest将其记为失败而不是错误。
+    """
+
+
+class Deadline:
+    """
+    单个测试的时间预算。
+
+    页面对象的每次等待、查找、滑动和ADB调用开始前都向预算申请超时时间，
+    同时记下一个步骤；两次申请之间经过的时间计入前一个步骤，预算用尽时据此报告各步骤的耗时。
+    """
+
+    def __init__(self, budget):
+        """
+        构造函数：初始化时间预算
+
+        参数:
+        - budget: 预算总时长（秒）
+        """
+        self.budget = budget
+        self.started = time.monotonic()
+        self.steps = []
+        self._step = None
+        self._mark = self.started
+
+    def remaining(self):
+        """
+        剩余的预算时长（秒），可能为负数。
+        """
+        return self.budget - (time.monotonic() - self.started)
+
+    def _enter(self, step):
+        # 结束上一个步骤的计时，开始记录新步骤
+        now = time.monotonic()
+        if self._step is not None:
+            self.steps.append((self._step, now - self._mark))
+        self._step = step
+        self._mark = now
+
+    def fit(self, step, timeout=None):
+        """
+        开始一个步骤，并把它的超时时间缩小到剩余预算以内。
+
+        参数:
+        - step: 步骤名称，用于耗时报告
+        - timeout: 步骤自身的超时时间（秒），为None时返回剩余预算
+
+        返回:
+        float: 实际可用的超时时间
+
+        抛出:
+        DeadlineExceeded: 如果预算已经用尽
+        """
+        self._enter(step)
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(self.report())
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def report(self, limit=10):
+        """
+        生成按步骤汇总的耗时报告，耗时最多的步骤排在前面。
+        """
+        steps = list(self.steps)
+        if self._step is not None:
+            # 预算用尽时正在执行的步骤也计入报告
+            steps.append((self._step, time.monotonic() - self._mark))
+        totals = {}
+        for step, seconds in steps:
+            count, total = totals.get(step, (0, 0))
+            totals[step] = (count + 1, total + seconds)
+        lines = [f"测试时间预算{self.budget}秒已用尽，耗时最多的步骤:"]
+        for step, (count, total) in sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]:
+            lines.append(f"  {total:.1f}秒  {count}次  {step}")
+        return "\n".join(lines)
+
+
+def start_deadline(budget=TEST_TIME_BUDGET):
+    """
+    为当前测试设置时间预算，通常在setUp中调用一次。
+    """
+    deadline = Deadline(budget)
+    _current.set(deadline)
+    return deadline
+
+
+def end_deadline():
+    """
+    清除当前测试的时间预算，通常在tearDown中调用。
+    """
+    _current.set(None)
+
+
+def current_deadline():
+    return _current.get()
+
+
+def fit_timeout(step, timeout=None):
+    """
+    从当前测试的剩余预算中申请超时时间，没有设置预算时原样返回timeout。
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return timeout
+    return deadline.fit(step, timeout)
+
+
+def raise_if_expired(error):
+    """
+    操作失败后检查当前测试的时间预算，预算已经用尽时改为抛出带耗时报告的DeadlineExceeded。
+
+    等待、查找、HTTP命令和ADB命令的超时都被缩小到剩余预算以内，它们因此超时时抛出的是
+    NoSuchElementException、TimeoutException、subprocess.TimeoutExpired或urllib3的超时，
+    看不出失败的原因是预算用尽。预算还有剩余时什么也不做，由调用方继续抛出原来的异常。
+
+    抛出:
+    DeadlineExceeded: 如果预算已经用尽，原来的异常作为其__cause__
+    """
+    deadline = _current.get()
+    if deadline is not None and deadline.remaining() <= 0:
+        raise DeadlineExceeded(deadline.report()) from error
+
+
+def within_deadline(func):
+    """
+    装饰页面对象中从时间预算申请超时时间的方法，预算用尽导致的失败统一以DeadlineExceeded上报。
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise_if_expired(e)
+            raise
+
+    return wrapper
+
+
+def set_command_timeout(driver, timeout=COMMAND_TIMEOUT):
+    """
+    设置driver单条HTTP命令的超时时间。
+
+    selenium的命令超时默认为120秒，不加限制时一条卡住的命令会远远超出测试的时间预算。
+    测试中按剩余预算缩小，tearDown中在driver.quit()之前恢复默认值。
+    """
+    command_executor = driver.command_executor
+    client_config = getattr(command_executor, "_client_config", None)
+    if client_config is not None:
+        client_config.timeout = timeout
+    else:
+        # 旧版本selenium只能设置RemoteConnection类级别的超时
+        command_executor.set_timeout(timeout)
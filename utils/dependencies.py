@@ -0,0 +1,51 @@
+import os
+
+
+class DependencyRecorder:
+    """
+    记录当前测试执行过程中用到的页面对象模块、定位器和数据文件。
+
+    BasePage在每次查找元素时调用record，用到图片模板、跳转图等文件时调用record_file，
+    测试结束后据此计算该测试的依赖指纹。
+    """
+
+    def __init__(self):
+        self.active = False
+        self.modules = set()
+        self.locators = set()
+        self.files = set()
+
+    def start(self):
+        self.active = True
+        self.modules = set()
+        self.locators = set()
+        self.files = set()
+
+    def stop(self):
+        self.active = False
+
+    def record(self, page, by, value):
+        """
+        记录一次元素查找。
+
+        参数:
+        - page: 发起查找的页面对象，其类继承链上属于page_objects包的模块都会被记录
+        - by: 定位方式
+        - value: 定位值
+        """
+        if not self.active:
+            return
+        for cls in type(page).__mro__:
+            if cls.__module__.startswith("page_objects."):
+                self.modules.add(cls.__module__)
+        self.locators.add(f"{by}={value}")
+
+    def record_file(self, path):
+        """
+        记录一个影响测试结果的数据文件，如图片模板、跳转图。
+        """
+        if self.active:
+            self.files.add(os.path.abspath(path))
+
+
+dependency_recorder = DependencyRecorder()
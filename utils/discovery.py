@@ -0,0 +1,96 @@
+import ast
+import fnmatch
+import os
+
+from config import DISCOVERY_CACHE_PATH, TESTS_DIR
+from utils.json_file import load_json, save_json
+
+
+def _is_test_case(node):
+    # 直接继承unittest.TestCase（或以TestCase结尾的基类）的类视为测试类
+    for base in node.bases:
+        name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", "")
+        if name.endswith("TestCase"):
+            return True
+    return False
+
+
+def scan_test_module(path, module_name):
+    """
+    通过解析源码（不导入模块）找出模块中的测试用例。
+
+    参数:
+    - path: 测试模块文件路径
+    - module_name: 模块名，如"tests.test_icon_click"
+
+    返回:
+    list: 测试用例ID，格式与unittest的TestCase.id()相同
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    test_ids = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and _is_test_case(node):
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name.startswith("test"):
+                    test_ids.append(f"{module_name}.{node.name}.{item.name}")
+    return test_ids
+
+
+def discover_tests(tests_dir=TESTS_DIR, cache_path=DISCOVERY_CACHE_PATH):
+    """
+    发现tests目录下的所有测试用例。
+
+    每个测试模块的扫描结果按文件的修改时间和大小缓存，文件未变化时直接复用，不解析也不导入。
+
+    返回:
+    list: 排序后的测试用例ID
+    """
+    cache = load_json(cache_path, {})
+
+    package = os.path.basename(os.path.normpath(tests_dir))
+    updated = {}
+    test_ids = []
+    for filename in sorted(os.listdir(tests_dir)):
+        if not (filename.startswith("test") and filename.endswith(".py")):
+            continue
+        path = os.path.join(tests_dir, filename)
+        stat = os.stat(path)
+        entry = cache.get(filename)
+        if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "tests": scan_test_module(path, f"{package}.{filename[:-3]}"),
+            }
+        updated[filename] = entry
+        test_ids.extend(entry["tests"])
+
+    if updated != cache:
+        save_json(cache_path, updated)
+    return sorted(test_ids)
+
+
+def select_tests(test_ids, patterns=None, shard=None):
+    """
+    按名称筛选测试用例并分片。
+
+    参数:
+    - test_ids: 测试用例ID列表
+    - patterns: 名称匹配模式列表，规则与unittest的-k相同：含通配符时按通配符匹配，否则按子串匹配
+    - shard: 分片，格式为"序号/总数"，序号从1开始，如"2/4"
+
+    返回:
+    list: 选中的测试用例ID
+    """
+    if patterns:
+        test_ids = [
+            test_id for test_id in test_ids
+            if any(fnmatch.fnmatchcase(test_id, p if "*" in p else f"*{p}*") for p in patterns)
+        ]
+    if shard:
+        index, total = (int(part) for part in shard.split("/"))
+        if not 1 <= index <= total:
+            raise ValueError(f"无效的分片: {shard}")
+        test_ids = test_ids[index - 1::total]
+    return test_ids
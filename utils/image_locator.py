@@ -0,0 +1,288 @@
+import io
+import os
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+from config import IMAGE_COARSE_CANDIDATES, IMAGE_COARSE_MIN_SIZE, IMAGE_COARSE_SCORE_RANGE
+from config import IMAGE_MATCH_SCALES, IMAGE_MATCH_THRESHOLD, IMAGE_PYRAMID_LEVELS
+
+# 模板预处理结果缓存，键为(模板路径, 修改时间, 缩放比例, 金字塔层数)
+_template_cache = {}
+
+
+class Match(namedtuple("Match", ["x", "y", "width", "height", "score"])):
+    """
+    一次模板匹配的结果区域（截图像素坐标）。
+    """
+
+    @property
+    def center(self):
+        return self.x + self.width // 2, self.y + self.height // 2
+
+
+def to_gray(png_bytes):
+    """
+    将PNG截图数据解码为float32灰度矩阵。
+    """
+    return np.asarray(Image.open(io.BytesIO(png_bytes)).convert("L"), dtype=np.float32)
+
+
+def downsample(image, factor):
+    """
+    按factor×factor块取均值缩小图像，用于构建图像金字塔。
+    """
+    if factor == 1:
+        return image
+    h, w = image.shape[0] // factor, image.shape[1] // factor
+    return image[:h * factor, :w * factor].reshape(h, factor, w, factor).mean(axis=(1, 3))
+
+
+def resize(image, height, width):
+    """
+    双线性插值缩放图像。
+    """
+    src_h, src_w = image.shape
+    ys = np.linspace(0, src_h - 1, height, dtype=np.float32)
+    xs = np.linspace(0, src_w - 1, width, dtype=np.float32)
+    y0 = np.floor(ys).astype(np.intp)
+    x0 = np.floor(xs).astype(np.intp)
+    y1 = np.minimum(y0 + 1, src_h - 1)
+    x1 = np.minimum(x0 + 1, src_w - 1)
+    wy = (ys - y0)[:, None]
+    wx = (xs - x0)[None, :]
+    top = image[y0][:, x0] * (1 - wx) + image[y0][:, x1] * wx
+    bottom = image[y1][:, x0] * (1 - wx) + image[y1][:, x1] * wx
+    return top * (1 - wy) + bottom * wy
+
+
+def _prepare(template):
+    # 去均值后的模板及其范数，供归一化互相关使用
+    zero_mean = template - template.mean()
+    return zero_mean, float(np.sqrt((zero_mean ** 2).sum()))
+
+
+def _phase_averaged_downsample(template, factor):
+    """
+    缩小模板，并对模板相对于顶层像素网格的所有偏移取平均。
+
+    截图中图标的位置不一定与顶层网格对齐，细线条在不同偏移下缩小的结果差别很大；
+    取平均后的模板在任何偏移下的粗匹配得分都比较接近，不会因为偏移不巧而排不进候选。
+    """
+    if factor == 1:
+        return template
+    total = 0
+    for dy in range(factor):
+        for dx in range(factor):
+            shifted = np.pad(template, ((dy, factor - dy), (dx, factor - dx)), mode="edge")
+            total = total + downsample(shifted, factor)
+    return total / (factor * factor)
+
+
+def load_template(path, scales=IMAGE_MATCH_SCALES, levels=IMAGE_PYRAMID_LEVELS):
+    """
+    读取模板图片并预处理出各缩放比例下的原分辨率模板和金字塔顶层模板，结果会被缓存。
+
+    较小的模板缩小后细线条会被抹平，粗匹配所在的层数会自动减少，使顶层模板的边长不小于IMAGE_COARSE_MIN_SIZE。
+
+    参数:
+    - path: 模板图片路径
+    - scales: 模板的缩放比例，用于适配不同分辨率的设备
+    - levels: 最多使用的金字塔层数，顶层分辨率为原图的1/2**levels
+
+    返回:
+    list: 每个缩放比例对应一个(原分辨率模板, 范数, 顶层模板, 范数, 频谱缓存, 层数)元组
+    """
+    key = (path, os.path.getmtime(path), tuple(scales), levels)
+    if key not in _template_cache:
+        with open(path, "rb") as f:
+            base = to_gray(f.read())
+        prepared = []
+        for scale in scales:
+            h, w = int(round(base.shape[0] * scale)), int(round(base.shape[1] * scale))
+            if h < 2 or w < 2:
+                continue
+            level = levels
+            while level > 0 and min(h, w) < IMAGE_COARSE_MIN_SIZE * 2 ** level:
+                level -= 1
+            fine = resize(base, h, w)
+            coarse = _phase_averaged_downsample(fine, 2 ** level)
+            # 频谱缓存保存顶层模板在不同FFT尺寸下的频谱
+            prepared.append(_prepare(fine) + _prepare(coarse) + ({}, level))
+        _template_cache[key] = prepared
+    return _template_cache[key]
+
+
+def _fast_length(n):
+    # 不小于n且只含因子2、3、5的长度，FFT在这类长度上最快
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _is_local_max(scores):
+    # 3×3邻域内的局部极大值，避免同一个峰值周围的点挤占候选名额
+    padded = np.pad(scores, 1, constant_values=-np.inf)
+    rows = np.maximum(np.maximum(padded[:-2], padded[1:-1]), padded[2:])
+    neighbourhood = np.maximum(np.maximum(rows[:, :-2], rows[:, 1:-1]), rows[:, 2:])
+    return scores >= neighbourhood
+
+
+def _integral(image):
+    # 积分图，首行首列补零，便于一次性求出所有窗口内的像素和
+    return np.pad(image, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+
+
+def _window_sums(integral, h, w):
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+
+def _inverse_std(sums, sums_sq, n):
+    # 窗口内去均值后像素的范数的倒数，纹理过于平坦的窗口记为0，使其得分为0
+    std = np.sqrt(np.maximum(sums_sq - sums ** 2 / n, 0))
+    return np.where(std > 1e-3 * np.sqrt(n), 1 / np.maximum(std, 1e-12), 0)
+
+
+def _normalize(corr, sums, sums_sq, n, norm):
+    # 由互相关结果和窗口统计量计算归一化互相关得分
+    return corr * _inverse_std(sums, sums_sq, n) / norm
+
+
+class _Frame:
+    """
+    一帧截图在某一金字塔层上的预计算数据：图像本身、FFT结果和积分图都只计算一次，被所有模板复用。
+    """
+
+    def __init__(self, image, max_template_shape):
+        # FFT用float32计算，积分图用float64避免大图上累加的精度损失
+        self.image = image.astype(np.float32)
+        self.fft_shape = (_fast_length(image.shape[0] + max_template_shape[0]),
+                          _fast_length(image.shape[1] + max_template_shape[1]))
+        self.spectrum = np.fft.rfft2(self.image, self.fft_shape)
+        image64 = image.astype(np.float64)
+        self.integral = _integral(image64)
+        self.integral_sq = _integral(image64 ** 2)
+        self._inverse_stds = {}
+
+    def ncc(self, template, norm, spectra):
+        """
+        计算模板在整帧上每个位置的归一化互相关得分，模板频谱按FFT尺寸缓存在spectra中。
+        """
+        h, w = template.shape
+        H, W = self.image.shape
+        if h > H or w > W or norm == 0:
+            return np.zeros((0, 0))
+        # 与翻转后的模板做卷积等价于互相关，取完全重叠的有效区域
+        if self.fft_shape not in spectra:
+            spectra[self.fft_shape] = np.fft.rfft2(template[::-1, ::-1].astype(np.float32), self.fft_shape)
+        kernel = spectra[self.fft_shape]
+        corr = np.fft.irfft2(self.spectrum * kernel, self.fft_shape)[h - 1:H, w - 1:W]
+        # 同尺寸模板共用窗口统计量
+        if (h, w) not in self._inverse_stds:
+            sums = _window_sums(self.integral, h, w)
+            sums_sq = _window_sums(self.integral_sq, h, w)
+            self._inverse_stds[(h, w)] = _inverse_std(sums, sums_sq, h * w).astype(np.float32)
+        return corr * self._inverse_stds[(h, w)] * np.float32(1 / norm)
+
+
+def _ncc_patch(patch, template, norm, spectra=None):
+    # 在小范围内计算归一化互相关，用于精匹配；窗口数较多时FFT比逐窗口相乘快得多，模板频谱按FFT尺寸缓存在spectra中
+    h, w = template.shape
+    if patch.shape[0] < h or patch.shape[1] < w or norm == 0:
+        return np.zeros((0, 0))
+    H, W = patch.shape
+    fft_shape = (_fast_length(H), _fast_length(W))
+    spectra = {} if spectra is None else spectra
+    if fft_shape not in spectra:
+        spectra[fft_shape] = np.fft.rfft2(template[::-1, ::-1], fft_shape)
+    corr = np.fft.irfft2(np.fft.rfft2(patch, fft_shape) * spectra[fft_shape], fft_shape)[h - 1:H, w - 1:W]
+    sums = _window_sums(_integral(patch), h, w)
+    sums_sq = _window_sums(_integral(patch ** 2), h, w)
+    return _normalize(corr, sums, sums_sq, h * w, norm)
+
+
+def _non_max_suppression(matches, max_matches):
+    # 按得分从高到低保留互不重叠的区域
+    kept = []
+    for match in sorted(matches, key=lambda m: m.score, reverse=True):
+        overlaps = any(
+            abs(match.x - k.x) < min(match.width, k.width) and abs(match.y - k.y) < min(match.height, k.height)
+            for k in kept
+        )
+        if not overlaps:
+            kept.append(match)
+            if len(kept) >= max_matches:
+                break
+    return kept
+
+
+def locate(screen, template_paths, threshold=IMAGE_MATCH_THRESHOLD, max_matches=1, levels=IMAGE_PYRAMID_LEVELS):
+    """
+    在一帧截图中同时定位多个模板。
+
+    先在金字塔顶层对整帧做多尺度粗匹配，再回到原分辨率在候选位置附近做精匹配。
+    图标相对于顶层像素网格的偏移会明显拉低粗匹配得分，因此粗匹配不设阈值，
+    每个缩放比例都按得分排名取若干候选，全部交给精匹配，最终只按精匹配得分取舍。
+
+    参数:
+    - screen: to_gray得到的截图灰度矩阵
+    - template_paths: 模板图片路径列表
+    - threshold: 精匹配的最低归一化互相关得分
+    - max_matches: 每个模板最多返回的区域数量
+    - levels: 最多使用的金字塔层数
+
+    返回:
+    dict: 模板路径到Match列表的映射，列表按得分从高到低排列
+    """
+    templates = {path: load_template(path, levels=levels) for path in template_paths}
+
+    # 每个金字塔层只构建一次，FFT尺寸按该层上最大的模板确定
+    max_shapes = {}
+    for prepared in templates.values():
+        for _, _, coarse, _, _, level in prepared:
+            h, w = max_shapes.get(level, (1, 1))
+            max_shapes[level] = (max(h, coarse.shape[0]), max(w, coarse.shape[1]))
+    frames = {level: _Frame(downsample(screen, 2 ** level), shape) for level, shape in max_shapes.items()}
+
+    results = {}
+    for path, prepared in templates.items():
+        candidates = []
+        for fine, fine_norm, coarse, coarse_norm, spectra, level in prepared:
+            factor = 2 ** level
+            # 粗匹配：取得分排名靠前、互不重叠的局部极大值
+            scores = frames[level].ncc(coarse, coarse_norm, spectra)
+            if scores.size == 0:
+                continue
+            flat = scores.ravel()
+            peaks = np.flatnonzero((scores > 0) & _is_local_max(scores))
+            peaks = peaks[np.argsort(flat[peaks])[::-1][:max_matches * IMAGE_COARSE_CANDIDATES * 4]]
+            # 得分远低于本比例最高分的位置不可能是目标，不再精匹配
+            if peaks.size:
+                peaks = peaks[flat[peaks] >= flat[peaks[0]] - IMAGE_COARSE_SCORE_RANGE]
+            h, w = fine.shape
+            hits = []
+            for index in peaks:
+                cy, cx = np.unravel_index(index, scores.shape)
+                hits.append(Match(int(cx * factor), int(cy * factor), w, h, float(flat[index])))
+
+            # 精匹配：回到原分辨率，在每个候选位置周围两个顶层像素的范围内计算
+            margin = 2 * factor
+            for hit in _non_max_suppression(hits, max_matches * IMAGE_COARSE_CANDIDATES):
+                y0 = max(hit.y - margin, 0)
+                x0 = max(hit.x - margin, 0)
+                patch = screen[y0:y0 + h + 2 * margin, x0:x0 + w + 2 * margin]
+                refined = _ncc_patch(patch, fine, fine_norm, spectra.setdefault("fine", {}))
+                if refined.size == 0:
+                    continue
+                ry, rx = np.unravel_index(np.argmax(refined), refined.shape)
+                score = float(refined[ry, rx])
+                if score >= threshold:
+                    candidates.append(Match(int(x0 + rx), int(y0 + ry), w, h, score))
+        results[path] = _non_max_suppression(candidates, max_matches)
+    return results
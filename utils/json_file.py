@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+
+
+def load_json(path, default):
+    """
+    读取JSON文件。
+
+    用于结果缓存、测试发现缓存等可以重建的文件：文件不存在、内容被截断或格式不对时返回default，
+    不让一份损坏的缓存使之后的每次运行都失败。
+
+    参数:
+    - path: 文件路径
+    - default: 无法读取时的返回值，同时约定文件内容的类型
+
+    返回:
+    文件内容，或default
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return default
+    return data if isinstance(data, type(default)) else default
+
+
+def save_json(path, data):
+    """
+    原子地写入JSON文件：先写到同目录下的临时文件，再替换原文件。
+
+    写入过程中被中断（如再次按下Ctrl-C）时，原文件保持完整，只会留下被清理的临时文件。
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        # 包括KeyboardInterrupt，中断时也要删除临时文件
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,50 @@
+import importlib
+
+
+class LazyImport:
+    """
+    延迟导入的模块或模块属性。
+
+    第一次访问属性或调用时才真正导入，用于推迟appium、selenium等较重的依赖，
+    使只列出、筛选测试时不必加载它们。
+    """
+
+    def __init__(self, module_name, attribute=None):
+        """
+        构造函数：记录要导入的目标
+
+        参数:
+        - module_name: 模块名，如"appium.webdriver.common.mobileby"
+        - attribute: 模块中的属性名，如"MobileBy"；为None时代理整个模块
+        """
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            target = importlib.import_module(self._module_name)
+            if self._attribute is not None:
+                target = getattr(target, self._attribute)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        target = self._module_name if self._attribute is None else f"{self._module_name}.{self._attribute}"
+        return f"<LazyImport {target}>"
+
+
+def lazy_import(module_name, attribute=None):
+    """
+    返回一个延迟导入的代理，用法与普通的导入结果相同。
+
+    例如:
+    MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
+    """
+    return LazyImport(module_name, attribute)
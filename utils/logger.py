@@ -1,8 +1,18 @@
 import logging
 
+LOGGER_NAME = 'app_ui_icon_test'
+
+
+def get_logger():
+    # 只获取日志器，不做配置，可以在模块导入时调用
+    return logging.getLogger(LOGGER_NAME)
+
 
 def setup_logger():
-    logger = logging.getLogger('app_ui_icon_test')
+    logger = get_logger()
+    # 已经配置过时直接返回，避免多个测试类重复添加处理器
+    if logger.handlers:
+        return logger
     logger.setLevel(logging.DEBUG)
 
     ch = logging.StreamHandler()
@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import json
+import os
+import xml.etree.ElementTree as ET
+
+from config import SCREEN_GRAPH_PATH
+from utils.deadline import DeadlineExceeded
+from utils.json_file import save_json
+
+# 计算指纹时使用的节点属性，文字、坐标等易变内容不参与计算
+FINGERPRINT_ATTRIBUTES = ("class", "resource-id", "package")
+
+# 标志元素定位方式对应的节点属性
+MARKER_ATTRIBUTES = {"id": "resource-id", "accessibility id": "content-desc", "class name": "class"}
+
+# 滑动方向及其反方向，用于撤销爬取时执行的滑动
+OPPOSITE_SWIPES = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+
+def screen_fingerprint(page_source):
+    """
+    根据页面层级结构计算界面指纹。
+
+    只使用节点的类名和resource-id，忽略文字、坐标等易变内容；
+    相邻且结构相同的兄弟节点（如列表项）只计一次，列表长度变化不会改变指纹。
+
+    参数:
+    page_source (str): driver.page_source返回的XML
+
+    返回:
+    str: 界面指纹
+    """
+    root = ET.fromstring(page_source.encode("utf-8"))
+
+    def signature(node):
+        own = "|".join(node.get(name, node.tag if name == "class" else "") for name in FINGERPRINT_ATTRIBUTES)
+        children = []
+        for child in node:
+            child_signature = signature(child)
+            if not children or children[-1] != child_signature:
+                children.append(child_signature)
+        return own + "(" + ",".join(children) + ")"
+
+    return hashlib.sha1(signature(root).encode("utf-8")).hexdigest()[:16]
+
+
+def matches_locator(node, by, value):
+    """
+    判断页面层级中的节点或其子孙节点是否符合定位器。
+
+    by为id、accessibility id或class name时按对应属性精确匹配；
+    by为text时，文字或content-desc中包含value即算匹配（可点击的容器通常把文字放在子节点里）。
+    """
+    if by != "text" and by not in MARKER_ATTRIBUTES:
+        raise ValueError(f"不支持的定位方式: {by}")
+    for child in node.iter():
+        if by == "text":
+            if value in child.get("text", "") or value in child.get("content-desc", ""):
+                return True
+        elif child.get(MARKER_ATTRIBUTES[by]) == value:
+            return True
+    return False
+
+
+def screen_markers(page_source, markers):
+    """
+    找出当前界面上出现的标志元素。
+
+    参数:
+    page_source (str): driver.page_source返回的XML
+    markers (dict): 界面名称到标志元素定位器(by, value)的映射，by支持id、accessibility id和class name
+
+    返回:
+    list: 标志元素出现在当前界面上的界面名称
+    """
+    root = ET.fromstring(page_source.encode("utf-8"))
+    present = set()
+    for node in root.iter():
+        for name in MARKER_ATTRIBUTES.values():
+            if node.get(name):
+                present.add((name, node.get(name)))
+    found = []
+    for screen, (by, value) in markers.items():
+        if by not in MARKER_ATTRIBUTES:
+            raise ValueError(f"标志元素不支持的定位方式: {by}")
+        if (MARKER_ATTRIBUTES[by], value) in present:
+            found.append(screen)
+    return found
+
+
+class ScreenGraph:
+    """
+    应用的界面跳转图：节点为界面指纹，边为从一个界面到另一个界面的操作（点击、滑动、返回）。
+
+    边的代价为执行该操作的耗时（秒），图以JSON形式持久化。
+    除指纹外，还可以通过标注的名称或界面所属的Activity名称引用界面。
+    """
+
+    def __init__(self, path=SCREEN_GRAPH_PATH):
+        """
+        构造函数：加载已保存的跳转图，文件不存在时为空图
+
+        参数:
+        - path: 跳转图的保存路径
+        """
+        self.path = path
+        self.names = {}
+        self.activities = {}
+        self.edges = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.names = data.get("names", {})
+            self.activities = data.get("activities", {})
+            self.edges = data.get("edges", {})
+
+    def save(self):
+        """
+        将跳转图写回文件，写入过程中被中断时原文件保持完整。
+        """
+        save_json(self.path, {"names": self.names, "activities": self.activities, "edges": self.edges})
+
+    def label(self, fingerprint, name):
+        """
+        给界面起一个便于在测试中引用的名称，如"home"、"course_list"。
+        """
+        self.names[name] = fingerprint
+
+    def record_activity(self, fingerprint, activity):
+        """
+        记录界面所属的Activity，如".activity.CourseListActivity"。
+        """
+        self.activities[fingerprint] = activity
+
+    def resolve(self, screen):
+        """
+        将界面名称、Activity名称或指纹解析为指纹集合。
+
+        一个Activity中可能有多个界面（如不同的Fragment），此时集合中包含其中所有界面。
+        Activity名称可以是完整类名，也可以是以"."开头的简写。
+
+        返回:
+        set: 目标界面的指纹
+        """
+        if screen in self.names:
+            return {self.names[screen]}
+        matched = {fingerprint for fingerprint, activity in self.activities.items()
+                   if activity == screen or activity.endswith(screen if screen.startswith(".") else "." + screen)}
+        return matched or {screen}
+
+    def add_edge(self, source, target, action, cost):
+        """
+        记录一条跳转边，同一操作重复记录时更新目标界面和代价。
+
+        参数:
+        - source: 起始界面指纹
+        - target: 操作后到达的界面指纹
+        - action: 操作描述字典，如{"type": "click", "by": "id", "value": "..."}
+        - cost: 操作耗时（秒）
+        """
+        edges = self.edges.setdefault(source, [])
+        for edge in edges:
+            if edge["action"] == action:
+                edge["to"] = target
+                edge["cost"] = cost
+                return
+        edges.append({"to": target, "action": action, "cost": cost})
+
+    def shortest_path(self, source, target):
+        """
+        用Dijkstra算法求代价最小的操作路径，target解析为多个界面时到达其中最近的一个即可。
+
+        返回:
+        list: 依次要经过的边；source就是目标界面时为空列表；不可达时为None
+        """
+        targets = self.resolve(target)
+        best = {source: 0}
+        previous = {}
+        queue = [(0, source)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if node in targets:
+                path = []
+                while node in previous:
+                    node, edge = previous[node]
+                    path.append(edge)
+                return path[::-1]
+            if cost > best.get(node, float("inf")):
+                continue
+            for edge in self.edges.get(node, []):
+                new_cost = cost + edge["cost"]
+                if new_cost < best.get(edge["to"], float("inf")):
+                    best[edge["to"]] = new_cost
+                    previous[edge["to"]] = (node, edge)
+                    heapq.heappush(queue, (new_cost, edge["to"]))
+        return None
+
+
+class AppCrawler:
+    """
+    深度优先遍历应用界面并构建跳转图的爬虫。
+
+    在每个界面上依次尝试点击可点击元素和四个方向的滑动，记录操作前后的界面指纹；
+    遇到新界面时继续深入，操作完成后先撤销滑动，再通过返回键或已知路径回到原界面。
+    访问到的界面会记录所属的Activity，出现标志元素的界面会被标注为对应的名称。
+    """
+
+    SWIPES = tuple(OPPOSITE_SWIPES)
+
+    def __init__(self, page, graph, max_depth=5, max_actions=500, markers=None, excluded=()):
+        """
+        构造函数：初始化爬虫
+
+        参数:
+        - page: 用于执行操作的页面对象（BasePage实例）
+        - graph: 要写入的ScreenGraph
+        - max_depth: 最大遍历深度
+        - max_actions: 最多执行的操作次数
+        - markers: 界面名称到标志元素定位器(by, value)的映射，用于标注界面
+        - excluded: 不允许点击的元素定位器(by, value)列表，如退出登录、删除、支付按钮
+        """
+        self.page = page
+        self.graph = graph
+        self.max_depth = max_depth
+        self.max_actions = max_actions
+        self.markers = markers or {}
+        self.excluded = tuple(excluded)
+        self.actions_done = 0
+        self.visited = set()
+
+    @staticmethod
+    def candidate_actions(page_source, excluded=()):
+        """
+        从页面层级中提取当前界面可执行的操作。
+
+        可点击元素优先使用resource-id定位，其次使用content-desc；
+        同一个resource-id对应多个元素时使用带下标的XPath。
+        自身或子孙节点符合excluded中任一定位器的元素不会被点击。
+        """
+        root = ET.fromstring(page_source.encode("utf-8"))
+        clickable = [node for node in root.iter() if node.get("clickable") == "true"]
+        id_counts = {}
+        for node in clickable:
+            resource_id = node.get("resource-id")
+            if resource_id:
+                id_counts[resource_id] = id_counts.get(resource_id, 0) + 1
+
+        actions = []
+        id_index = {}
+        for node in clickable:
+            resource_id = node.get("resource-id")
+            description = node.get("content-desc")
+            if resource_id and id_counts[resource_id] == 1:
+                action = {"type": "click", "by": "id", "value": resource_id}
+            elif resource_id:
+                # 被排除的元素也要计入下标，XPath下标按文档中的全部同id元素计算
+                id_index[resource_id] = id_index.get(resource_id, 0) + 1
+                action = {"type": "click", "by": "xpath",
+                          "value": f"(//*[@resource-id='{resource_id}'])[{id_index[resource_id]}]"}
+            elif description:
+                action = {"type": "click", "by": "accessibility id", "value": description}
+            else:
+                continue
+            if not any(matches_locator(node, by, value) for by, value in excluded):
+                actions.append(action)
+        actions.extend({"type": "swipe", "direction": direction} for direction in AppCrawler.SWIPES)
+        return actions
+
+    @staticmethod
+    def undo_action(action):
+        """
+        返回能撤销该操作的操作：滑动的撤销是反方向滑动，其他操作无法直接撤销时返回None。
+        """
+        if action["type"] == "swipe":
+            return {"type": "swipe", "direction": OPPOSITE_SWIPES[action["direction"]]}
+        return None
+
+    def crawl(self, depth=0):
+        """
+        从当前界面开始遍历，返回时跳转图已保存。
+        """
+        source = self.page.current_screen()
+        page_source = self.page.driver.page_source
+        self._visit(source, page_source)
+        for action in self.candidate_actions(page_source, self.excluded):
+            if self.actions_done >= self.max_actions:
+                break
+            self.actions_done += 1
+            try:
+                cost = self.page.perform_action(action)
+            except DeadlineExceeded:
+                raise
+            except Exception:
+                continue
+            target = self.page.current_screen()
+            if target == source:
+                continue
+            self.graph.add_edge(source, target, action, cost)
+            if target not in self.visited and depth + 1 < self.max_depth:
+                self.crawl(depth + 1)
+            if not self._return_to(source, action):
+                break
+        if depth == 0:
+            self.graph.save()
+
+    def _visit(self, fingerprint, page_source):
+        # 记录界面所属的Activity，并用标志元素标注界面
+        self.visited.add(fingerprint)
+        self.graph.record_activity(fingerprint, self.page.driver.current_activity)
+        for name in screen_markers(page_source, self.markers):
+            self.graph.label(fingerprint, name)
+
+    def _return_to(self, source, action):
+        # 依次尝试撤销刚才的操作和返回键，仍未回到原界面时沿已知路径导航回去
+        current = self.page.current_screen()
+        undo = self.undo_action(action)
+        for step in ([undo] if undo else []) + [{"type": "back"}]:
+            cost = self.page.perform_action(step)
+            returned = self.page.current_screen()
+            if returned != current:
+                self.graph.add_edge(current, returned, step, cost)
+            if returned == source:
+                return True
+            current = returned
+        try:
+            self.page.navigate_to(source, graph=self.graph)
+            return True
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            return False
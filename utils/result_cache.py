@@ -0,0 +1,264 @@
+import ast
+import hashlib
+import importlib.util
+import os
+import subprocess
+import unittest
+
+from config import APP_PACKAGE, RESULT_CACHE_PATH
+from utils.dependencies import dependency_recorder
+from utils.json_file import load_json, save_json
+
+# 缓存条目的格式版本，格式变化后旧条目全部失效
+ENTRY_VERSION = 2
+
+
+def _module_origin(module_name):
+    # 模块源文件路径，不会导入该模块
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not os.path.exists(spec.origin):
+        return None
+    return spec.origin
+
+
+def module_hash(module_name):
+    """
+    计算模块源文件内容的哈希，不会导入该模块。
+    """
+    origin = _module_origin(module_name)
+    if origin is None:
+        return None
+    with open(origin, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def file_hash(path):
+    """
+    计算数据文件内容的哈希；目录按其中的文件名列表计算，文件不存在时返回None。
+    """
+    if os.path.isdir(path):
+        return hashlib.sha1("\n".join(sorted(os.listdir(path))).encode("utf-8")).hexdigest()
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def utils_imports(module_name):
+    """
+    解析模块源码，找出其中导入的utils包模块，包括函数内的导入和lazy_import的延迟导入。
+    """
+    origin = _module_origin(module_name)
+    if origin is None:
+        return set()
+    with open(origin, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module == "utils":
+            found.update(f"utils.{alias.name}" for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            found.add(node.module)
+        elif (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "lazy_import" and node.args
+              and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            found.add(node.args[0].value)
+    return {name for name in found if name.startswith("utils.")}
+
+
+def module_dependencies(module_names):
+    """
+    在给定模块之外，加上它们直接或间接导入的所有utils模块。
+    """
+    result = set()
+    pending = list(module_names)
+    while pending:
+        name = pending.pop()
+        if name in result:
+            continue
+        result.add(name)
+        pending.extend(utils_imports(name) - result)
+    return result
+
+
+def apk_fingerprint(package=APP_PACKAGE):
+    """
+    计算设备上已安装APK的指纹。
+
+    使用pm path得到的安装路径（与BasePage.get_app_storage_path相同的命令）以及dumpsys中的版本号和更新时间，
+    应用被重新安装或升级后指纹会改变。
+
+    返回:
+    str: APK指纹；无法通过ADB获取时返回None，此时不复用任何缓存结果
+    """
+    try:
+        path = subprocess.check_output(f"adb shell pm path {package}", shell=True).decode("utf-8").strip()
+        dump = subprocess.check_output(f"adb shell dumpsys package {package}", shell=True).decode("utf-8")
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    if not path:
+        return None
+    version_lines = sorted(
+        line.strip() for line in dump.splitlines()
+        if line.strip().startswith(("versionCode=", "versionName=", "lastUpdateTime="))
+    )
+    return hashlib.sha1("\n".join([path] + version_lines).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    按测试保存上一次的执行结果及其依赖指纹，以JSON形式持久化。
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH):
+        self.path = path
+        # 缓存文件损坏时视为空缓存，所有测试重新执行
+        self.entries = load_json(path, {})
+
+    def save(self):
+        save_json(self.path, self.entries)
+
+    def lookup(self, test_id, apk):
+        """
+        查找仍然有效的缓存结果。
+
+        APK指纹一致，且测试上次用到的所有模块源码和数据文件都没有变化时，缓存结果有效。
+        定义在页面对象、测试模块或配置中的定位器随模块哈希一起校验，图片定位器对应的模板文件按内容校验。
+
+        返回:
+        dict: 缓存条目，包含modules、files、locators；无有效缓存时返回None
+        """
+        entry = self.entries.get(test_id)
+        if apk is None or entry is None or entry.get("version") != ENTRY_VERSION or entry["apk"] != apk:
+            return None
+        for module_name, digest in entry["modules"].items():
+            if module_hash(module_name) != digest:
+                return None
+        for path, digest in entry["files"].items():
+            if file_hash(path) != digest:
+                return None
+        return entry
+
+    def store(self, test_id, apk, modules, files, locators):
+        """
+        保存一次通过的执行结果，模块会连同其导入的utils模块一起计算哈希。
+        """
+        self.entries[test_id] = {
+            "version": ENTRY_VERSION,
+            "apk": apk,
+            "modules": {name: module_hash(name) for name in sorted(module_dependencies(modules))},
+            "files": {path: file_hash(path) for path in sorted(files)},
+            "locators": sorted(locators),
+        }
+
+    def discard(self, test_id):
+        """
+        删除测试的缓存结果，测试下次一定会重新执行。
+        """
+        self.entries.pop(test_id, None)
+
+
+class ReusedResult(unittest.TestCase):
+    """
+    代替依赖未变化且上次通过的测试，记为跳过。
+    """
+
+    def __init__(self, test, entry):
+        super().__init__("runTest")
+        self.test = test
+        self.entry = entry
+
+    def id(self):
+        return self.test.id()
+
+    def __str__(self):
+        return str(self.test)
+
+    def runTest(self):
+        self.skipTest("依赖未变化，复用上次结果: passed")
+
+
+class CachedTestResult(unittest.TextTestResult):
+    """
+    在每个测试执行期间开启依赖记录，测试结束后将结果和依赖指纹写入缓存。
+
+    只缓存通过的结果：失败和错误（包括连接断开等基础设施问题）都不缓存，下次一定重新执行；
+    没有用到任何页面对象的测试无法判断依赖是否变化，同样不缓存。
+    """
+
+    def __init__(self, stream, descriptions, verbosity, cache=None, apk=None):
+        super().__init__(stream, descriptions, verbosity)
+        self.cache = cache
+        self.apk = apk
+        self._outcomes_before = 0
+
+    def _outcome_count(self):
+        return (len(self.failures) + len(self.errors) + len(self.skipped)
+                + len(self.expectedFailures) + len(self.unexpectedSuccesses))
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._outcomes_before = self._outcome_count()
+        if not isinstance(test, ReusedResult):
+            dependency_recorder.start()
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        if isinstance(test, ReusedResult) or not dependency_recorder.active:
+            return
+        dependency_recorder.stop()
+        passed = self._outcome_count() == self._outcomes_before
+        if not passed or not dependency_recorder.modules:
+            self.cache.discard(test.id())
+            return
+        # 测试自身所在的模块和配置也是依赖的一部分
+        modules = dependency_recorder.modules | {type(test).__module__, "config"}
+        self.cache.store(test.id(), self.apk, modules, dependency_recorder.files, dependency_recorder.locators)
+
+
+class CachedTestRunner(unittest.TextTestRunner):
+    """
+    带结果缓存的测试运行器：依赖未变化的测试不再执行，直接复用上次结果。
+    """
+
+    resultclass = CachedTestResult
+
+    def __init__(self, force=False, **kwargs):
+        """
+        构造函数：初始化测试运行器
+
+        参数:
+        - force: 为True时忽略缓存强制执行全部测试，结果仍会写入缓存
+        - kwargs: 传给unittest.TextTestRunner的其他参数
+        """
+        super().__init__(**kwargs)
+        self.force = force
+        self.cache = ResultCache()
+        self.apk = None
+
+    def _makeResult(self):
+        return self.resultclass(self.stream, self.descriptions, self.verbosity, cache=self.cache, apk=self.apk)
+
+    def run(self, test):
+        self.apk = apk_fingerprint()
+        selected = unittest.TestSuite()
+        for case in _flatten(test):
+            entry = None if self.force else self.cache.lookup(case.id(), self.apk)
+            selected.addTest(ReusedResult(case, entry) if entry is not None else case)
+        try:
+            return super().run(selected)
+        finally:
+            self.cache.save()
+
+
+def _flatten(suite):
+    # 展开嵌套的测试套件，得到单个测试用例
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _flatten(test)
+        else:
+            yield test